@@ -0,0 +1,28 @@
+#!/usr/bin/env python
+
+from time import time
+
+from skyfield import almanac
+from skyfield.api import load, wgs84
+
+def main():
+    ts = load.timescale()
+    eph = load('de421.bsp')
+    topos = wgs84.latlon(40.8939, -83.8917)
+    t0 = ts.utc(2020, 1, 1)
+    t1 = ts.utc(2021, 1, 1)
+
+    start = time()
+    f = almanac.dark_twilight_day(eph, topos)
+    t, y = almanac.find_discrete(t0, t1, f)
+    print(time() - start, 'seconds for find_discrete(dark_twilight_day)')
+
+    start = time()
+    t2, y2 = almanac.find_twilights(eph['earth'] + topos, eph['sun'], t0, t1)
+    print(time() - start, 'seconds for find_twilights()')
+
+    assert list(y) == list(y2)
+    print(abs(t.tt - t2.tt).max() * 86400.0, 'seconds largest difference')
+
+if __name__ == '__main__':
+    main()
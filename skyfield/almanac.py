@@ -6,10 +6,14 @@ from __future__ import division
 import numpy as np
 from numpy import cos, sin, zeros_like
 from .constants import pi, tau
-from .framelib import ecliptic_frame
-from .searchlib import find_discrete
+from .framelib import ecliptic_frame, itrs
+from .functions import from_spherical, mxv, to_spherical
+from .positionlib import Astrometric
+from .starlib import Star
+from .searchlib import _counted, _finish_record, _start_record, find_discrete
 from .nutationlib import iau2000b_radians
-from .units import Angle
+from .units import Angle, Distance
+from .vectorlib import VectorSum
 
 # Not only to support historic code but also for future convenience, let
 # folks import the search routine alongside the almanac routines.
@@ -336,7 +340,8 @@ _sun_horizon_radians = -50.0 / 21600.0 * tau
 _refraction_radians = -34.0 / 21600.0 * tau
 _moon_radius_m = 1.7374e6
 
-def _find(observer, target, start_time, end_time, horizon_degrees, f):
+def _find(observer, target, start_time, end_time, horizon_degrees, f,
+          routine, indexes):
     # Build a function h() that returns the angle above or below the
     # horizon we are aiming for, in radians.
     if horizon_degrees is None:
@@ -356,6 +361,29 @@ def _find(observer, target, start_time, end_time, horizon_degrees, f):
 
     geo = observer.vector_functions[-1]  # should we check observer.center?
     latitude = geo.latitude
+    many_stars = (isinstance(target, Star)
+                  and getattr(target.ra.radians, 'shape', ()))
+    many_sites = getattr(latitude.radians, 'shape', ())
+    if many_stars and many_sites:
+        raise ValueError('cannot search for an array of stars from an array'
+                         ' of sites; please loop over either the stars or'
+                         ' the sites instead')
+    if (many_stars or many_sites) and not indexes:
+        raise ValueError(_indexes_message)
+    if many_stars:
+        return _find_stars(observer, geo, target, start_time, end_time,
+                           h, f, routine)
+    if many_sites:
+        return _find_at_sites(observer, geo, target, start_time, end_time,
+                              h, f, routine)
+
+    def hadec(t):
+        _fastify(t)
+        return observer.at(t).observe(target).apparent().hadec()
+
+    record = _start_record(routine, None,
+                           getattr(target, 'target_name', repr(target)))
+    hadec = _counted(hadec, record)
 
     # Build an array of times 0.8 days apart, in the hopes that nothing
     # ever rises (or sets or transits) twice within a 0.8-day period.
@@ -366,8 +394,7 @@ def _find(observer, target, start_time, end_time, horizon_degrees, f):
     t = ts.tt_jd(np.linspace(tt0, tt1, sample_count))
 
     # Determine the target's hour angle and declination at those times.
-    _fastify(t)
-    ha, dec, distance = observer.at(t).observe(target).apparent().hadec()
+    ha, dec, distance = hadec(t)
 
     # Invoke our geometry formula: for each time `t`, predict the hour
     # angle at which the target will next reach the horizon, if its
@@ -401,18 +428,236 @@ def _find(observer, target, start_time, end_time, horizon_degrees, f):
     # new one against the USNO.  It suggests that 3 iterations is enough
     # for the Moon, the fastest-moving Solar System object, to match.
     for i in 0, 1, 2:
-        _fastify(t)
-        ha, dec, distance = observer.at(t).observe(target).apparent().hadec()
+        ha, dec, distance = hadec(t)
         desired_ha = f(latitude, dec, h(distance))
         ha_adjustment = desired_ha - ha.radians
         ha_adjustment = (ha_adjustment + pi) % tau - pi
         timebump = ha_adjustment / ha_per_day
         t = ts.tt_jd(t.whole, t.tt_fraction + timebump)
 
+    _finish_record(record, 3)
     is_above_horizon = (desired_ha % pi != 0.0)
+    if indexes:
+        return t, is_above_horizon, np.zeros(len(is_above_horizon), int)
     return t, is_above_horizon
 
-def find_risings(observer, target, start_time, end_time, horizon_degrees=None):
+_indexes_message = (
+    'to search from an array of sites or for an array of stars, pass'
+    ' indexes=True, and receive an extra array giving the index of the'
+    ' site or star of each event'
+)
+
+def _find_at_sites(observer, geo, target, start_time, end_time, h, f,
+                   routine):
+    """Run `_find()` for a `GeographicPosition` that holds many sites.
+
+    Instead of observing the target from every site at every time, we
+    observe it once an hour from the geocenter, then interpolate its
+    ITRS position and subtract each site's own position.
+
+    """
+    geocenter = VectorSum(observer.center, geo.center,
+                          observer.vector_functions[:-1])
+    record = _start_record(routine, None,
+                           getattr(target, 'target_name', repr(target)))
+    grid = _sky_grid(geocenter, target, start_time.ts, start_time.tt,
+                     end_time.tt, record)
+    tt, is_above_horizon, site = _find_on_grid(
+        grid, geo, start_time.tt, end_time.tt, h, f)
+    _finish_record(record, 3)
+    return start_time.ts.tt_jd(tt), is_above_horizon, site
+
+def _sky_grid(geocenter, target, ts, tt0, tt1, record=None):
+    """Return the target's distance, declination, and sublongitude.
+
+    The target is observed from the geocenter once an hour, from a day
+    before `tt0` until a day after `tt1`, and its position rotated into
+    the ITRS.  Returns the grid's TT dates followed by the three arrays.
+
+    """
+    def itrs_position(t):
+        _fastify(t)
+        p = geocenter.at(t).observe(target).apparent()
+        return mxv(itrs.rotation_at(t), p.position.au)
+
+    itrs_position = _counted(itrs_position, record)
+    grid_count = int(np.ceil((tt1 - tt0 + 2.0) * 24.0)) + 1
+    grid_tt = np.linspace(tt0 - 1.0, tt1 + 1.0, grid_count)
+    grid_au, grid_dec, grid_lon = to_spherical(
+        itrs_position(ts.tt_jd(grid_tt)))
+    return grid_tt, grid_au, grid_dec, np.unwrap(grid_lon)
+
+# How many samples `_find_on_grid()` computes at once, which bounds its
+# memory use however many sites are being searched.
+_GRID_CHUNK_SAMPLES = 500000
+
+def _find_on_grid(grid, geo, tt0, tt1, h, f):
+    """Find events between `tt0` and `tt1` from a `_sky_grid()`.
+
+    Returns the TT date of each event, whether the target really meets
+    the horizon, and the index of the site at which the event occurs.
+
+    """
+    xyz = geo.itrs_xyz.au.reshape(3, -1)
+    lat = np.ravel(geo.latitude.radians)
+    lon = np.ravel(geo.longitude.radians)
+    sample_count = int(np.ceil((tt1 - tt0) / 0.8)) + 1
+    chunk = max(1, _GRID_CHUNK_SAMPLES // sample_count)
+
+    results = []
+    for j in range(0, len(lat), chunk):
+        k = slice(j, j + chunk)
+        tt, is_above_horizon, site = _find_on_grid_chunk(
+            grid, xyz[:,k], lat[k], lon[k], tt0, tt1, sample_count, h, f)
+        results.append((tt, is_above_horizon, site + j))
+    tt, is_above_horizon, site = zip(*results)
+    return (np.concatenate(tt), np.concatenate(is_above_horizon),
+            np.concatenate(site))
+
+def _find_on_grid_chunk(grid, xyz, lat, lon, tt0, tt1, sample_count, h, f):
+    """Run `_find_on_grid()` for a slice of its sites."""
+    grid_tt, grid_au, grid_dec, grid_lon = grid
+
+    def hadec(tt, site):
+        r = from_spherical(np.interp(tt, grid_tt, grid_au),
+                           np.interp(tt, grid_tt, grid_dec),
+                           np.interp(tt, grid_tt, grid_lon))
+        au, dec, sublongitude = to_spherical(r - xyz[:,site])
+        ha = (lon[site] - sublongitude + pi) % tau - pi
+        return ha, Angle(radians=dec), Distance(au)
+
+    # The same steps as in `_find()`, but with each site's samples in
+    # its own row of a two-dimensional array.
+    tt = np.linspace(tt0, tt1, sample_count)
+    site = np.repeat(np.arange(len(lat)), sample_count)
+    ha, dec, distance = hadec(np.tile(tt, len(lat)), site)
+    desired_ha_radians = f(Angle(radians=lat[site]), dec, h(distance))
+    difference = (desired_ha_radians - ha) % tau
+    difference = difference.reshape(len(lat), sample_count)
+
+    site, i = np.nonzero(np.diff(difference, axis=1) > 0.0)
+    a = difference[site, i]
+    b = tau - difference[site, i + 1]
+    tt = (b * tt[i] + a * tt[i+1]) / (a + b)
+    latitude = Angle(radians=lat[site])
+
+    for i in 0, 1, 2:
+        ha, dec, distance = hadec(tt, site)
+        desired_ha = f(latitude, dec, h(distance))
+        ha_adjustment = desired_ha - ha
+        ha_adjustment = (ha_adjustment + pi) % tau - pi
+        tt = tt + ha_adjustment / tau
+
+    is_above_horizon = np.broadcast_to(desired_ha % pi != 0.0, tt.shape)
+    return tt, is_above_horizon, site
+
+# The Earth's rotation angle advances this many radians each day.
+_sidereal_radians_per_day = tau * 1.00273781191135448
+
+def _find_stars(observer, geo, star, start_time, end_time, h, f, routine):
+    """Run `_find()` for a `Star` that holds many stars.
+
+    A star's hour angle advances at nearly the sidereal rate, so we
+    observe all of the stars together once a day and solve for every
+    event directly, interpolating each star's apparent place to correct
+    the solution.  Daily samples cannot follow the part of the apparent
+    place that varies with the hour angle itself, like diurnal
+    aberration, so a last step observes each star at its own event.
+
+    """
+    ts = start_time.ts
+    tt0 = start_time.tt
+    tt1 = end_time.tt
+    rate = _sidereal_radians_per_day
+    latitude = geo.latitude
+    lon = geo.longitude.radians
+
+    # Rather than calling `hadec()`, which would compute the nutation
+    # afresh for every star, rotate all of the stars by the same matrix.
+    def hadec(t):
+        _fastify(t)
+        p = observer.at(t).observe(star).apparent()
+        r = mxv(itrs.rotation_at(t), p.position.au)
+        au, dec, sublongitude = to_spherical(r)
+        return lon - sublongitude, dec, Distance(au)
+
+    # The hour angle and declination of star `i[k]` at time `tt[k]`.
+    def hadec_of_each(tt, i):
+        t = ts.tt_jd(tt)
+        _fastify(t)
+        o = observer.at(t)
+        p, v, t, light_time = star._observe_each_from_bcrs(o, i)
+        astrometric = Astrometric(p, v, t, o.target, star.target)
+        astrometric._ephemeris = o._ephemeris
+        astrometric.center_barycentric = o
+        astrometric.light_time = light_time
+        r = mxv(itrs.rotation_at(t), astrometric.apparent().position.au)
+        au, dec, sublongitude = to_spherical(r)
+        return lon - sublongitude, dec, Distance(au)
+
+    record = _start_record(routine, None, 'stars')
+    hadec = _counted(hadec, record)
+    hadec_of_each = _counted(hadec_of_each, record)
+
+    # Each star's hour angle, less the steady sidereal advance, and its
+    # declination, at daily intervals across the search.
+    grid_count = int(np.ceil(tt1 - tt0)) + 1
+    grid_tt = np.linspace(tt0, tt1, max(grid_count, 2))
+    residuals = []
+    declinations = []
+    for tt in grid_tt:
+        ha, dec, distance = hadec(ts.tt_jd(tt))
+        residuals.append(ha - rate * (tt - tt0))
+        declinations.append(dec)
+    residuals = np.unwrap(residuals, axis=0)
+    declinations = np.array(declinations)
+    altitude = h(distance)
+
+    step = grid_tt[1] - grid_tt[0]
+    last = len(grid_tt) - 2
+
+    def interpolate(tt, i):
+        x = np.clip((tt - tt0) / step, 0.0, last + 1.0)
+        k = np.minimum(x.astype(int), last)
+        x -= k
+        r = residuals[k, i] * (1.0 - x) + residuals[k + 1, i] * x
+        d = declinations[k, i] * (1.0 - x) + declinations[k + 1, i] * x
+        return r + rate * (tt - tt0), Angle(radians=d)
+
+    # Solve for every event of every star, starting from its place at
+    # the beginning of the search, then correct each solution using the
+    # star's interpolated apparent place at the time of the event.
+    star_count = residuals.shape[1]
+    desired_ha = f(latitude, Angle(radians=declinations[0]), altitude)
+    first = (desired_ha - residuals[0]) % tau / rate
+    n = np.arange(-1, int(np.ceil((tt1 - tt0) * rate / tau)) + 1)
+    tt = (tt0 + first[:,None] + n * tau / rate).flatten()
+    i = np.repeat(np.arange(star_count), len(n))
+
+    for iteration in 0, 1:
+        ha, dec = interpolate(tt, i)
+        desired_ha = f(latitude, dec, altitude)
+        ha_adjustment = desired_ha - ha
+        ha_adjustment = (ha_adjustment + pi) % tau - pi
+        tt = tt + ha_adjustment / rate
+
+    # Take a last step from each star's full apparent place.
+    keep = (tt >= tt0 - 0.1) & (tt < tt1 + 0.1)
+    tt = tt[keep]
+    i = i[keep]
+    ha, dec, distance = hadec_of_each(tt, i)
+    desired_ha = f(latitude, Angle(radians=dec), h(distance))
+    ha_adjustment = desired_ha - ha
+    ha_adjustment = (ha_adjustment + pi) % tau - pi
+    tt = tt + ha_adjustment / rate
+
+    keep = (tt >= tt0) & (tt < tt1)
+    _finish_record(record, 2)
+    is_above_horizon = np.broadcast_to(desired_ha % pi != 0.0, tt.shape)
+    return ts.tt_jd(tt[keep]), is_above_horizon[keep], i[keep]
+
+def find_risings(observer, target, start_time, end_time, horizon_degrees=None,
+                 indexes=False):
     """Return the times at which a target rises above the eastern horizon.
 
     Given an observer on the Earth’s surface, a target like the Sun or
@@ -423,16 +668,21 @@ def find_risings(observer, target, start_time, end_time, horizon_degrees=None):
     the target really crosses the horizon, and ``False`` when the target
     merely transits without actually touching the horizon.
 
-    See `risings-and-settings` for examples, and `horizon_degrees` for
-    how to use the ``horizon_degrees`` argument.
+    If you pass ``indexes=True``, a third array is also returned, giving
+    the index of the site or star to which each event belongs; this is
+    required when searching from many sites or for many stars at once.
+    See `risings-and-settings` for examples, `horizon_degrees` for how
+    to use the ``horizon_degrees`` argument, and `many-sites` for how
+    to search from many observers, or for many stars, at once.
 
     .. versionadded:: 1.47
 
     """
     return _find(observer, target, start_time, end_time, horizon_degrees,
-                 _rising_hour_angle)
+                 _rising_hour_angle, 'find_risings', indexes)
 
-def find_settings(observer, target, start_time, end_time, horizon_degrees=None):
+def find_settings(observer, target, start_time, end_time, horizon_degrees=None,
+                  indexes=False):
     """Return the times at which a target sets below the western horizon.
 
     Given an observer on the Earth’s surface, a target like the Sun or
@@ -443,28 +693,210 @@ def find_settings(observer, target, start_time, end_time, horizon_degrees=None):
     the target really crosses the horizon, and ``False`` when the target
     merely transits without actually touching the horizon.
 
-    See `risings-and-settings` for examples, and `horizon_degrees` for
-    how to use the ``horizon_degrees`` argument.
+    If you pass ``indexes=True``, a third array is also returned, giving
+    the index of the site or star to which each event belongs; this is
+    required when searching from many sites or for many stars at once.
+    See `risings-and-settings` for examples, `horizon_degrees` for how
+    to use the ``horizon_degrees`` argument, and `many-sites` for how
+    to search from many observers, or for many stars, at once.
 
     .. versionadded:: 1.47
 
     """
     return _find(observer, target, start_time, end_time, horizon_degrees,
-                 _setting_hour_angle)
+                 _setting_hour_angle, 'find_settings', indexes)
 
-def find_transits(observer, target, start_time, end_time):
+def find_transits(observer, target, start_time, end_time, indexes=False):
     """Return the times at which a target transits across the meridian.
 
     Given an observer on the Earth’s surface, a target like the Sun or
     Moon or a planet, and start and stop :class:`~skyfield.timelib.Time`
     objects, this returns a :class:`~skyfield.timelib.Time` array
     listing the moments at which the target transits across the
-    meridian.
+    meridian.  If you pass ``indexes=True``, a second array is also
+    returned, giving the index of the site or star to which each transit
+    belongs; this is required when searching from many sites or for many
+    stars at once.
 
-    See `transits` for example code.
+    See `transits` for example code, and `many-sites` for how to search
+    from many observers, or for many stars, at once.
 
     .. versionadded:: 1.47
 
     """
-    t, _ = _find(observer, target, start_time, end_time, 0.0, _transit_ha)
-    return t
+    result = _find(observer, target, start_time, end_time, 0.0, _transit_ha,
+                   'find_transits', indexes)
+    if indexes:
+        return result[0], result[2]
+    return result[0]
+
+def find_twilights(observer, sun, start_time, end_time):
+    """Return the times at which the sky passes between night and day.
+
+    Given an observer on the Earth’s surface, the Sun, and start and
+    stop :class:`~skyfield.timelib.Time` objects, this returns the same
+    two arrays as running :func:`~skyfield.searchlib.find_discrete()`
+    on :func:`dark_twilight_day()`: a :class:`~skyfield.timelib.Time`
+    of the moments at which the sky changes, and an array giving the
+    new state after each change, with the codes listed in
+    ``TWILIGHTS``.  Instead of bisection, it uses the Sun’s hour angle
+    to predict all eight twilight and sunrise and sunset boundaries of
+    each day together, needing far fewer positions of the Sun.
+
+    """
+    geo = observer.vector_functions[-1]
+    latitude = geo.latitude
+
+    def hadec(t):
+        _fastify(t)
+        return observer.at(t).observe(sun).apparent().hadec()
+
+    record = _start_record('find_twilights', None,
+                           getattr(sun, 'target_name', repr(sun)))
+    hadec = _counted(hadec, record)
+
+    ts = start_time.ts
+    tt0 = start_time.tt
+    tt1 = end_time.tt
+    sample_count = int(np.ceil((tt1 - tt0) / 0.8)) + 1
+    t = ts.tt_jd(np.linspace(tt0, tt1, sample_count))
+    ha, dec, distance = hadec(t)
+    tt = t.tt
+
+    # Predict every crossing of each of the four altitudes that divide
+    # night, the three twilights, and day, both rising and setting.
+    event_tt = []
+    signs = []
+    altitudes = []
+    codes = []
+    for code, altitude in enumerate(_twilight_altitudes):
+        setting_ha = _setting_hour_angle(latitude, dec, altitude)
+        for sign, new_code in (-1.0, code + 1), (1.0, code):
+            difference = (sign * setting_ha - ha.radians) % tau
+            i, = np.nonzero(np.diff(difference) > 0.0)
+            a = difference[i]
+            b = tau - difference[i + 1]
+            event_tt.append((b * tt[i] + a * tt[i+1]) / (a + b))
+            signs.append(np.full(len(i), sign))
+            altitudes.append(np.full(len(i), altitude))
+            codes.append(np.full(len(i), new_code))
+
+    event_tt = np.concatenate(event_tt)
+    sign = np.concatenate(signs)
+    altitude = np.concatenate(altitudes)
+    y = np.concatenate(codes)
+    t = ts.tt_jd(event_tt)
+
+    if len(event_tt):
+        for i in 0, 1, 2:
+            ha, dec, distance = hadec(t)
+            desired_ha = sign * _setting_hour_angle(latitude, dec, altitude)
+            ha_adjustment = desired_ha - ha.radians
+            ha_adjustment = (ha_adjustment + pi) % tau - pi
+            timebump = ha_adjustment / tau
+            t = ts.tt_jd(t.whole, t.tt_fraction + timebump)
+        crosses = (desired_ha % pi != 0.0)
+    else:
+        crosses = np.zeros(0, bool)
+
+    _finish_record(record, 3)
+    order = np.argsort(t.tt[crosses])
+    return t[crosses][order], y[crosses][order]
+
+_twilight_altitudes = [
+    -18.0 / 360.0 * tau,
+    -12.0 / 360.0 * tau,
+    -6.0 / 360.0 * tau,
+    _sun_horizon_radians,
+]
+
+# Every day's events, for many sites at once.
+
+DAILY_EVENTS = [
+    'astronomical_dawn', 'nautical_dawn', 'civil_dawn', 'sunrise',
+    'sun_transit', 'sunset', 'civil_dusk', 'nautical_dusk',
+    'astronomical_dusk', 'moonrise', 'moon_transit', 'moonset',
+]
+
+def _daily_searches():
+    sun = lambda distance: _sun_horizon_radians
+    moon = lambda distance: _refraction_radians - _moon_radius_m / distance.m
+    meridian = lambda distance: 0.0
+    searches = [
+        ('sunrise', 'sun', _rising_hour_angle, sun),
+        ('sunset', 'sun', _setting_hour_angle, sun),
+        ('sun_transit', 'sun', _transit_ha, meridian),
+        ('moonrise', 'moon', _rising_hour_angle, moon),
+        ('moonset', 'moon', _setting_hour_angle, moon),
+        ('moon_transit', 'moon', _transit_ha, meridian),
+    ]
+    twilights = [('civil', 6.0), ('nautical', 12.0), ('astronomical', 18.0)]
+    for name, degrees in twilights:
+        radians = - degrees / 360.0 * tau
+        h = lambda distance, radians=radians: radians
+        searches.append((name + '_dawn', 'sun', _rising_hour_angle, h))
+        searches.append((name + '_dusk', 'sun', _setting_hour_angle, h))
+    return searches
+
+def daily_almanac(ephemeris, topos, start_time, end_time, chunk_days=10):
+    """Generate each day’s Sun and Moon events for one or more sites.
+
+    ``topos`` is a geographic position, like one returned by
+    :meth:`~skyfield.toposlib.Geoid.latlon()`, whose latitude and
+    longitude can be arrays of many sites.  This generator yields one
+    tuple ``(t, events)`` for each successive 24-hour day that begins
+    at ``start_time``, until the day that includes ``end_time``.  The
+    ``t`` is the :class:`~skyfield.timelib.Time` at which the day
+    begins, and ``events`` is a dictionary whose keys are the names
+    in ``DAILY_EVENTS`` and whose values are arrays, the same shape as
+    the sites, of the TT Julian date of each event, or ``nan`` for a
+    site where the event does not happen that day.
+
+    The Sun and Moon are observed only once for each ``chunk_days``
+    days, and every kind of event is derived from those same
+    positions, so memory use stays bounded no matter how many days you
+    ask for.  See `daily-almanac` for an example.
+
+    """
+    ts = start_time.ts
+    earth = ephemeris['earth']
+    targets = {'sun': ephemeris['sun'], 'moon': ephemeris['moon']}
+    searches = _daily_searches()
+    shape = np.shape(topos.latitude.radians)
+    site_count = int(np.prod(shape))
+
+    tt_start = start_time.tt
+    day_count = int(np.ceil(end_time.tt - tt_start))
+    margin = 0.1
+
+    for d0 in range(0, day_count, chunk_days):
+        d1 = min(d0 + chunk_days, day_count)
+        tt0 = tt_start + d0 - margin
+        tt1 = tt_start + d1 + margin
+        record = _start_record('daily_almanac', None, 'Sun and Moon')
+        grids = dict((key, _sky_grid(earth, target, ts, tt0, tt1, record))
+                     for key, target in targets.items())
+
+        events = {}
+        for name, key, f, h in searches:
+            tt, is_above_horizon, site = _find_on_grid(
+                grids[key], topos, tt0, tt1, h, f)
+            if f is not _transit_ha:
+                tt = tt[is_above_horizon]
+                site = site[is_above_horizon]
+            day = np.floor(tt - tt_start).astype(int)
+            keep = (day >= d0) & (day < d1)
+            tt, day, site = tt[keep], day[keep] - d0, site[keep]
+
+            # Write the latest events first, so that the earliest event
+            # of a given day is the one left standing.
+            order = np.argsort(-tt)
+            table = np.full((d1 - d0, site_count), np.nan)
+            table[day[order], site[order]] = tt[order]
+            events[name] = table
+        _finish_record(record, 3)
+
+        for i in range(d1 - d0):
+            t = ts.tt_jd(tt_start + d0 + i)
+            yield t, dict((name, events[name][i].reshape(shape))
+                          for name in DAILY_EVENTS)
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+"""Search a catalog of minor planets for close approaches to a planet.
+
+Propagating every orbit in a catalog like MPCORB across a whole night,
+or a whole year, would waste nearly all of its effort on minor planets
+whose orbits never come anywhere near the Earth.  So we first estimate
+each orbit’s minimum orbit intersection distance (MOID) with the Earth’s
+orbit, which needs nothing but its elements, and discard every minor
+planet that could not possibly come close.  The few that remain are
+propagated together on a coarse grid of times, and each near miss found
+there is then refined with :func:`~skyfield.searchlib.find_minima()`.
+
+"""
+from __future__ import division
+
+from numpy import (
+    arccos, argmin, array, asarray, clip, cos, einsum, empty, hypot,
+    linspace, nonzero, pi, sin, take_along_axis, zeros,
+)
+from .data.spice import inertial_frames
+from .functions import length_of
+from .keplerlib import _KeplerOrbit
+from .searchlib import find_minima
+from .sgp4lib import _cross
+from .units import Distance, Velocity
+
+# How far the Earth strays from a circle of 1 au, and how far the Moon
+# strays from the Earth, both with a little room to spare.
+_EARTH_ORBIT_SLACK_AU = 0.018
+_MOON_ORBIT_SLACK_AU = 0.0028
+_MOID_CHUNK = 10000
+
+def close_approaches(orbits, ephemeris, start_time, end_time,
+                     max_distance_au=0.05, body='earth', step_days=1.0):
+    """Find the close approaches of many minor planets to the Earth or Moon.
+
+    ``orbits`` should be a single orbit object for a whole catalog of
+    minor planets, like the one returned by
+    :func:`~skyfield.data.mpc.mpcorb_orbits()`, and ``ephemeris`` a
+    planetary ephemeris.  Every approach between ``start_time`` and
+    ``end_time`` that brings a minor planet within ``max_distance_au``
+    of the ``body``, which may be ``'earth'`` or ``'moon'``, is returned
+    as four arrays:
+
+    * A :class:`~skyfield.timelib.Time` giving the moment of closest
+      approach.
+    * The index of each minor planet within ``orbits``.
+    * A :class:`~skyfield.units.Distance` giving the closest approach.
+    * A :class:`~skyfield.units.Velocity` giving the speed of the minor
+      planet relative to the body at that moment.
+
+    The approaches are sorted by time.  Orbits are propagated together
+    on a grid of times ``step_days`` apart, so make the step small
+    enough that no close approach lasts less than about two steps.
+
+    """
+    ts = start_time.ts
+    sun = ephemeris['sun']
+    planet = ephemeris[body]
+
+    slack = _EARTH_ORBIT_SLACK_AU
+    if body == 'moon':
+        slack += _MOON_ORBIT_SLACK_AU
+    moid = _moid_estimates(orbits)
+    candidates, = nonzero(moid < max_distance_au + slack)
+
+    def relative_state(orbit, t):
+        # Orbits are heliocentric, so convert them to planetocentric.
+        s = sun.at(t)
+        b = planet.at(t)
+        position, velocity = orbit._at(t)[:2]
+        shape = (3, -1) + t.shape
+        offset = (s.position.au - b.position.au).reshape(shape)
+        position = position.reshape(shape) + offset
+        offset = (s.velocity.au_per_d - b.velocity.au_per_d).reshape(shape)
+        velocity = velocity.reshape(shape) + offset
+        return position, velocity
+
+    # A coarse look at every candidate, on a shared grid of times.
+    count = int((end_time.tt - start_time.tt) / step_days) + 3
+    grid_tt = linspace(start_time.tt - step_days, end_time.tt + step_days,
+                       count)
+    if len(candidates):
+        subset = _take(orbits, candidates)
+        position, velocity = relative_state(subset, ts.tt_jd(grid_tt))
+        distance = length_of(position)
+        speed = length_of(velocity)
+    else:
+        distance = speed = zeros((0, count))
+
+    # Keep each grid minimum that could hide a close enough approach:
+    # the true minimum can be nearer than the grid shows by as much as
+    # the distance traveled in a step.
+    middle = distance[:,1:-1]
+    dip = (middle <= distance[:,:-2]) & (middle <= distance[:,2:])
+    near = middle < max_distance_au + speed[:,1:-1] * step_days
+    rows, columns = nonzero(dip & near)
+
+    times = []
+    indexes = []
+    for row, column in zip(rows, columns):
+        orbit = _take(subset, [row])
+
+        def f(t):
+            return length_of(relative_state(orbit, t)[0])
+
+        f.step_days = step_days / 4.0
+        t0 = ts.tt_jd(grid_tt[column])
+        t1 = ts.tt_jd(grid_tt[column + 2])
+        t, d = find_minima(t0, t1, f)
+        if len(t):
+            times.append(t.tt[argmin(d)])
+            indexes.append(candidates[row])
+
+    tt = array(times)
+    i = array(indexes, dtype=int)
+    keep = (tt >= start_time.tt) & (tt <= end_time.tt)
+    order = tt[keep].argsort()
+    tt = tt[keep][order]
+    i = i[keep][order]
+
+    # Measure each approach using its own orbit.
+    position = zeros((3, len(i)))
+    velocity = zeros((3, len(i)))
+    for n, (tt_n, i_n) in enumerate(zip(tt, i)):
+        p, v = relative_state(_take(orbits, [i_n]), ts.tt_jd(tt_n))
+        position[:,n] = p.flatten()
+        velocity[:,n] = v.flatten()
+
+    distance = length_of(position)
+    close = distance <= max_distance_au
+    t = ts.tt_jd(tt[close])
+    return (t, i[close], Distance(distance[close]),
+            Velocity(length_of(velocity)[close]))
+
+def _take(orbits, indexes):
+    """Return a `_KeplerOrbit` holding only some of a catalog's orbits."""
+    epoch = orbits.epoch
+    if epoch.shape:
+        epoch = epoch[indexes]
+    mu = asarray(orbits.mu_au3_d2)
+    if mu.shape:
+        mu = mu[indexes]
+    target = orbits.target
+    if target is not None and not isinstance(target, (int, str)):
+        target = asarray(target)[indexes]
+    subset = _KeplerOrbit(
+        Distance(orbits.position_at_epoch.au[:,indexes]),
+        Velocity(orbits.velocity_at_epoch.au_per_d[:,indexes]),
+        epoch,
+        mu,
+        orbits.center,
+        target,
+    )
+    subset._rotation = orbits._rotation
+    return subset
+
+def _moid_estimates(orbits, samples=72):
+    """Estimate each orbit's closest approach to a circle of 1 au.
+
+    The circle lies in the plane of the ecliptic.  We sample each orbit
+    at evenly spaced true anomalies, then twice more sample finely
+    around the nearest point found so far.
+
+    """
+    position = orbits.position_at_epoch.au
+    velocity = orbits.velocity_at_epoch.au_per_d
+    rotation = inertial_frames['ECLIPJ2000']
+    if orbits._rotation is not None:
+        rotation = rotation.dot(orbits._rotation)
+    position = rotation.dot(position)
+    velocity = rotation.dot(velocity)
+    mu = orbits.mu_au3_d2
+
+    # Build unit vectors P toward perihelion and Q at a right angle to
+    # it within the orbit plane, plus the semi-latus rectum p.
+    h = _cross(position, velocity)
+    r = length_of(position)
+    e_vector = _cross(velocity, h) / mu - position / r
+    e = length_of(e_vector)
+    circular = e < 1e-9
+    P = e_vector / (e + circular)
+    P[:,circular] = (position / r)[:,circular]
+    Q = _cross(h, P) / length_of(h)
+    p = (h * h).sum(axis=0) / mu
+
+    # Hyperbolic orbits only reach true anomalies short of the asymptote.
+    limit = arccos(clip(-1.0 / (e + circular), -1.0, 1.0)) * 0.999
+    limit[e < 1.0] = pi
+
+    def distance_at(nu, P, Q, p, e):
+        radius = p[:,None] / (1.0 + e[:,None] * cos(nu))
+        x = radius * cos(nu)
+        y = radius * sin(nu)
+        xyz = einsum('in,nk->ink', P, x) + einsum('in,nk->ink', Q, y)
+        rho = hypot(xyz[0], xyz[1])
+        return hypot(rho - 1.0, xyz[2])
+
+    # Work through the catalog in chunks, to bound memory use.
+    moid = empty(len(e))
+    fraction = linspace(-1.0, 1.0, samples)
+    for start in range(0, len(e), _MOID_CHUNK):
+        j = slice(start, start + _MOID_CHUNK)
+        nu = limit[j,None] * fraction
+        width = nu[:,1] - nu[:,0]
+        for _ in 0, 1, 2:
+            d = distance_at(nu, P[:,j], Q[:,j], p[j], e[j])
+            k = argmin(d, axis=1)[:,None]
+            best = take_along_axis(nu, k, axis=1)
+            nu = clip(best + width[:,None] * fraction,
+                      -limit[j,None], limit[j,None])
+            width = width * 2.0 / (samples - 1)
+        moid[j] = take_along_axis(d, k, axis=1)[:,0]
+    return moid
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""Fast selection and projection of the stars that fill a star chart.
+
+Drawing a chart by observing every star in a catalog, and only then
+discarding the stars that fall outside the field or are too faint, does
+most of its work on stars that are never plotted.  A `ChartCatalog`
+instead sorts the catalog once into declination zones, each zone sorted
+by magnitude, and keeps a unit vector for every star.  Choosing the
+stars for a chart then needs only a binary search per zone and a dot
+product per candidate before any astrometry is performed.
+
+"""
+from numpy import (
+    arange, arcsin, clip, concatenate, cos, floor, lexsort, minimum,
+    searchsorted, sqrt, tan,
+)
+from .constants import pi, tau
+from .functions import length_of
+from .projections import build_stereographic_projection
+from .starlib import Star, _unwrap
+from .units import Angle
+
+_DEG2RAD = tau / 360.0
+
+class ChartCatalog(object):
+    """A star catalog indexed for quick selection of the stars in a chart.
+
+    Build a `ChartCatalog` from a dataframe of stars, like the one
+    returned by :func:`skyfield.data.hipparcos.load_dataframe()`, or from
+    a dictionary of arrays with the same column names.  The catalog needs
+    the columns ``ra_hours``, ``dec_degrees``, ``epoch_year``, and
+    ``magnitude``; and will use proper motion and parallax columns too,
+    if they are present.
+
+    ``zone_degrees`` sets the height of the declination zones into which
+    the catalog is divided.
+
+    """
+    def __init__(self, df, zone_degrees=2.0):
+        star = Star.from_dataframe(df)
+        magnitude = _unwrap(df['magnitude'])
+        position = star._position_au
+        unit = position / length_of(position)
+        dec = arcsin(clip(unit[2], -1.0, 1.0))
+
+        zone_count = int(180.0 / zone_degrees + 0.5)
+        zone_radians = pi / zone_count
+        zone = minimum(floor((dec + pi / 2.0) / zone_radians), zone_count - 1)
+
+        order = lexsort((magnitude, zone))
+        zone = zone[order]
+
+        self.rows = order
+        self.magnitude = magnitude[order]
+        self.star = _take(star, order)
+        self._unit = unit[:, order]
+        self._zone_radians = zone_radians
+        self._zone_starts = searchsorted(zone, arange(zone_count + 1))
+
+    def select(self, center_unit_vector, radius_radians, magnitude_limit):
+        """Return the indexes of the stars near a point on the sky.
+
+        Returns the index into this catalog’s sorted arrays of every
+        star no fainter than ``magnitude_limit`` whose catalog position
+        lies within ``radius_radians`` of the |xyz| unit vector
+        ``center_unit_vector``.
+
+        """
+        x, y, z = center_unit_vector
+        dec = arcsin(clip(z, -1.0, 1.0))
+        zone_count = len(self._zone_starts) - 1
+        lo = int((max(dec - radius_radians, -pi / 2.0) + pi / 2.0)
+                 / self._zone_radians)
+        hi = int((min(dec + radius_radians, pi / 2.0) + pi / 2.0)
+                 / self._zone_radians)
+        hi = min(hi, zone_count - 1)
+
+        magnitude = self.magnitude
+        starts = self._zone_starts
+        ranges = []
+        for zone in range(lo, hi + 1):
+            start = starts[zone]
+            end = starts[zone + 1]
+            end = start + searchsorted(magnitude[start:end], magnitude_limit,
+                                       side='right')
+            ranges.append(arange(start, end))
+        i = concatenate(ranges)
+
+        u = self._unit[:, i]
+        dot = u[0] * x + u[1] * y + u[2] * z
+        return i[dot >= cos(radius_radians)]
+
+    def chart(self, observer, center, fov_degrees, magnitude_limit,
+              margin_degrees=0.5):
+        """Return the plotting coordinates of the stars in a chart.
+
+        ``observer`` — A barycentric position, like ``earth.at(t)``, from
+        which the stars are observed.
+
+        ``center`` — The position at the center of the chart, like the
+        result of ``earth.at(t).observe(comet)``.
+
+        ``fov_degrees`` — The diameter of the circular field of view.
+
+        ``magnitude_limit`` — The faintest stars to include.
+
+        Stars are first culled using their catalog positions, with an
+        extra ``margin_degrees`` of slack to allow for proper motion and
+        aberration, and only the survivors are observed and projected
+        with :func:`~skyfield.projections.build_stereographic_projection()`.
+        Returns four arrays: the *x* and *y* plotting coordinates of each
+        star within the field of view, its magnitude, and the number of
+        the row in the original dataframe from which it came.
+
+        """
+        p = center.position.au
+        if len(p.shape) > 1:
+            p = p.mean(axis=1)
+        center_unit_vector = p / length_of(p)
+
+        radius = fov_degrees / 2.0 * _DEG2RAD
+        i = self.select(center_unit_vector, radius + margin_degrees * _DEG2RAD,
+                        magnitude_limit)
+
+        project = build_stereographic_projection(center)
+        x, y = project(observer.observe(_take(self.star, i)))
+
+        # A stereographic projection maps an angle θ from the center of
+        # the chart to a distance tan(θ/2) from the origin.
+        limit = tan(radius / 2.0)
+        keep = sqrt(x * x + y * y) <= limit
+        return x[keep], y[keep], self.magnitude[i][keep], self.rows[i][keep]
+
+def _take(star, indexes):
+    """Return a `Star` holding only the chosen stars from a `Star` array."""
+    subset = Star.__new__(Star)
+    subset.__dict__.update(star.__dict__)
+    for name in ('ra_mas_per_year', 'dec_mas_per_year', 'parallax_mas',
+                 'radial_km_per_s', 'epoch'):
+        value = getattr(star, name)
+        if getattr(value, 'shape', None):
+            setattr(subset, name, value[indexes])
+    subset.ra = Angle(radians=star.ra.radians[indexes], preference='hours')
+    subset.dec = Angle(radians=star.dec.radians[indexes], signed=True)
+    subset._position_au = star._position_au[:, indexes]
+    subset._velocity_au_per_d = star._velocity_au_per_d[:, indexes]
+    subset.__dict__.pop('_unit_vector', None)
+    return subset
@@ -26,12 +26,13 @@ declination, then look up the indexes in the grid.  Memory requirement:
 
 """
 import zlib
-from numpy import searchsorted
+from numpy import arange, clip, cumsum, pad, searchsorted, where
 from pkgutil import get_data
-from .functions import load_bundled_npy
+from .constants import tau
+from .functions import load_bundled_npy, from_spherical, mxv, to_spherical
 from .timelib import Time, julian_date_of_besselian_epoch
 
-def load_constellation_map():
+def load_constellation_map(tile_degrees=None):
     """Load Skyfield's constellation boundaries and return a lookup function.
 
     Skyfield carries an internal map of constellation boundaries that is
@@ -46,8 +47,25 @@ def load_constellation_map():
 
     If you pass an array of positions, you'll receive an array of names.
 
+    If you already have plain arrays of ICRS right ascension and
+    declination — for example, the columns of a star catalog — you can
+    skip building a position and call the lookup function’s
+    ``constellation_of_radec()`` attribute instead:
+
+    >>> constellation_at.constellation_of_radec(5.919, 7.407)
+    'Ori'
+
+    The rotation from the ICRS to the B1875 coordinates in which the
+    boundaries are defined is computed once, when the map is loaded.
+    If you will be looking up millions of positions, you can also ask
+    for the sky to be pre-tiled into cells ``tile_degrees`` on a side.
+    Positions that fall in a cell lying entirely within a single
+    constellation are then answered by direct indexing, and only the
+    positions in cells crossed by a boundary need a binary search.
+
     """
     t1875 = Time(None, julian_date_of_besselian_epoch(1875))
+    M = t1875.M
 
     arrays = load_bundled_npy('constellations.npz')
     sorted_ra = arrays['sorted_ra']
@@ -55,15 +73,78 @@ def load_constellation_map():
     radec_to_index = arrays['radec_to_index']
     indexed_abbreviations = arrays['indexed_abbreviations']
 
-    def constellation_at(position):
-        ra, dec, distance = position.radec(epoch=t1875)
-        i = searchsorted(sorted_ra, ra.hours)
-        j = searchsorted(sorted_dec, dec.degrees, side='right')
-        k = radec_to_index[i, j]
+    def index_of(ra_hours, dec_degrees):
+        i = searchsorted(sorted_ra, ra_hours)
+        j = searchsorted(sorted_dec, dec_degrees, side='right')
+        return radec_to_index[i, j]
+
+    if tile_degrees is not None:
+        tiles = _build_tiles(sorted_ra, sorted_dec, radec_to_index,
+                             tile_degrees)
+        tiles_per_hour = 15.0 / tile_degrees
+        tiles_per_degree = 1.0 / tile_degrees
+        ra_tiles, dec_tiles = tiles.shape
+
+        def index_of(ra_hours, dec_degrees, index_of=index_of):
+            i = clip((ra_hours * tiles_per_hour).astype(int), 0, ra_tiles - 1)
+            j = clip(((dec_degrees + 90.0) * tiles_per_degree).astype(int),
+                     0, dec_tiles - 1)
+            k = tiles[i, j]
+            ambiguous = k < 0
+            if ambiguous.any():
+                k = where(ambiguous, 0, k)
+                k[ambiguous] = index_of(ra_hours[ambiguous],
+                                        dec_degrees[ambiguous])
+            return k
+
+    def lookup(position_au):
+        _, dec, ra = to_spherical(mxv(M, position_au))
+        k = index_of(ra * 24.0 / tau, dec * 360.0 / tau)
         return indexed_abbreviations[k]
 
+    def constellation_at(position):
+        return lookup(position.position.au)
+
+    def constellation_of_radec(ra_hours, dec_degrees):
+        ra = ra_hours / 24.0 * tau
+        dec = dec_degrees / 360.0 * tau
+        return lookup(from_spherical(1.0, dec, ra))
+
+    constellation_at.constellation_of_radec = constellation_of_radec
     return constellation_at
 
+def _build_tiles(sorted_ra, sorted_dec, radec_to_index, tile_degrees):
+    """Return a grid of constellation indexes, with -1 for ambiguous tiles.
+
+    Each tile covers the right ascensions [a, b) and declinations [c, d)
+    and will return for any position inside it one of the indexes in the
+    block of `radec_to_index` that the binary searches above can reach.
+    If that block holds more than one value, the tile is ambiguous.
+    Edges are padded by a tiny epsilon so that a position rounded into a
+    neighboring tile still receives the right answer.
+
+    """
+    eps = 1e-9
+    ra_edges = arange(0.0, 360.0 + tile_degrees / 2.0, tile_degrees) / 15.0
+    dec_edges = arange(-90.0, 90.0 + tile_degrees / 2.0, tile_degrees)
+
+    i0 = searchsorted(sorted_ra, ra_edges[:-1] - eps)
+    i1 = searchsorted(sorted_ra, ra_edges[1:] + eps)
+    j0 = searchsorted(sorted_dec, dec_edges[:-1] - eps, side='right')
+    j1 = searchsorted(sorted_dec, dec_edges[1:] + eps)
+
+    # Summed-area tables count how many times the index changes between
+    # neighboring cells, letting us test each block with a few lookups.
+    g = radec_to_index
+    di = pad(cumsum(cumsum(g[1:] != g[:-1], 0), 1), ((1, 0), (1, 0)))
+    dj = pad(cumsum(cumsum(g[:, 1:] != g[:, :-1], 0), 1), ((1, 0), (1, 0)))
+
+    I0, J0 = i0[:, None], j0[None, :]
+    I1, J1 = i1[:, None], j1[None, :]
+    changes = (di[I1, J1 + 1] - di[I0, J1 + 1] - di[I1, J0] + di[I0, J0]
+               + dj[I1 + 1, J1] - dj[I0, J1] - dj[I1 + 1, J0] + dj[I0, J0])
+    return where(changes == 0, g[I0, J0], -1).astype('int8')
+
 def load_constellation_names():
     """Return a list of abbreviation-name tuples, like ``('Aql', 'Aquila')``.
 
@@ -0,0 +1,121 @@
+"""Cache star catalogs on disk as directories of NumPy column files.
+
+Parsing a large text catalog like Hipparcos or Tycho-2 with Pandas can
+take seconds or even minutes.  The routines here save the parsed
+columns, once, as individual ``.npy`` files in a directory alongside
+the original catalog, with the rows sorted by magnitude.  Later loads
+memory-map only the columns they need, and a magnitude limit becomes a
+binary search plus a slice, so the rows of fainter stars are never even
+read from disk.
+
+"""
+import os
+import shutil
+
+import numpy as np
+
+SUFFIX = '.columns'
+_STAMP = '_source'
+
+def cache_directory_for(path):
+    """Return the path of the column cache for the catalog at ``path``."""
+    return path + SUFFIX
+
+def is_fresh(path, directory):
+    """Return whether ``directory`` was built from ``path`` as it now stands.
+
+    The cache is considered stale if the catalog file has since been
+    modified, or changed size, or if the cache was never completed.
+
+    """
+    try:
+        stamp = np.load(os.path.join(directory, _STAMP + '.npy'))
+    except (IOError, OSError, ValueError):
+        return False
+    st = os.stat(path)
+    return stamp[0] == st.st_mtime and stamp[1] == st.st_size
+
+def save_columns(directory, columns, source_path, sort_by='magnitude'):
+    """Save a dictionary of NumPy column arrays as a cache directory.
+
+    Rows are first sorted by the ``sort_by`` column, with ``nan`` values
+    last.  The directory is built under a temporary name and renamed
+    into place only once complete, so a reader never sees a half-written
+    cache.
+
+    """
+    order = np.argsort(columns[sort_by], kind='mergesort')
+    tmp = '{0}.tmp{1}'.format(directory, os.getpid())
+    if os.path.exists(tmp):
+        shutil.rmtree(tmp)
+    os.makedirs(tmp)
+    for name, array in columns.items():
+        array = np.asarray(array)[order]
+        if array.dtype == object:
+            array = array.astype(str)
+        np.save(os.path.join(tmp, name + '.npy'), array)
+    st = os.stat(source_path)
+    stamp = np.array([st.st_mtime, st.st_size], dtype=np.float64)
+    np.save(os.path.join(tmp, _STAMP + '.npy'), stamp)
+    if os.path.exists(directory):
+        shutil.rmtree(directory)
+    os.rename(tmp, directory)
+
+def load_columns(directory, names=None, magnitude_limit=None,
+                 sort_by='magnitude'):
+    """Memory-map columns from a cache directory written by `save_columns()`.
+
+    If ``names`` is ``None`` then every column is returned.  If a
+    ``magnitude_limit`` is given, then only the rows whose ``sort_by``
+    column is less than or equal to the limit are returned.
+
+    """
+    if names is None:
+        names = sorted(filename[:-4] for filename in os.listdir(directory)
+                       if filename.endswith('.npy')
+                       and filename != _STAMP + '.npy')
+
+    def load(name):
+        path = os.path.join(directory, name + '.npy')
+        if not os.path.exists(path):
+            raise ValueError('the catalog cache has no column named {0!r}'
+                             .format(name))
+        return np.load(path, mmap_mode='r')
+
+    if magnitude_limit is None:
+        end = None
+    else:
+        end = np.searchsorted(load(sort_by), magnitude_limit, side='right')
+
+    return dict((name, load(name)[:end]) for name in names)
+
+def load_cached_columns(path, load_dataframe, index_name,
+                        names=None, magnitude_limit=None,
+                        sort_by='magnitude'):
+    """Load a catalog's columns, parsing and caching the catalog if needed.
+
+    The first call parses the catalog at ``path`` with the supplied
+    ``load_dataframe()`` routine and saves each column as a NumPy
+    ``.npy`` file in a directory alongside the catalog, named by adding
+    ``.columns`` to its filename, with the rows sorted by ``sort_by``.
+    Later calls memory-map the cache instead of parsing the text, unless
+    the catalog file has been modified since.  The dataframe's index is
+    saved as the column ``index_name``, unless ``index_name`` is
+    ``None``.
+
+    Returns a dictionary mapping column names to NumPy arrays, which can
+    be passed straight to :meth:`~skyfield.starlib.Star.from_dataframe()`.
+    To avoid reading data you don't need, ask for only a subset of
+    column ``names``, or supply a ``magnitude_limit`` to receive only
+    stars at least that bright.
+
+    """
+    directory = cache_directory_for(path)
+    if not is_fresh(path, directory):
+        with open(path, 'rb') as f:
+            df = load_dataframe(f)
+        columns = dict((name, df[name].values) for name in df.columns)
+        if index_name is not None:
+            columns[index_name] = df.index.values
+        save_columns(directory, columns, path, sort_by)
+    return load_columns(directory, names, magnitude_limit, sort_by)
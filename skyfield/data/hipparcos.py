@@ -1,3 +1,5 @@
+from .columnar import load_cached_columns
+
 # This URL worked until September 2020:
 #
 # URL = 'http://cdsarc.u-strasbg.fr/ftp/cats/I/239/hip_main.dat.gz'
@@ -74,3 +76,13 @@ def load_dataframe(fobj):
         epoch_year = 1991.25,
     )
     return df.set_index('hip')
+
+def load_columns(path, columns=None, magnitude_limit=None):
+    """Load ``hip_main.dat`` through an on-disk cache of its columns.
+
+    See :func:`~skyfield.data.columnar.load_cached_columns()`; the
+    catalog number is returned as the column ``'hip'``.
+
+    """
+    return load_cached_columns(path, load_dataframe, 'hip',
+                               columns, magnitude_limit)
@@ -3,11 +3,15 @@
 
 import io
 import re
+import zlib
 
+import numpy as np
 import pandas as pd
 
 from ..data.spice import inertial_frames
+from .columnar import load_cached_columns
 from ..keplerlib import _KeplerOrbit
+from ..starlib import _unwrap
 from ..timelib import julian_day
 
 MPCORB_URL = 'https://www.minorplanetcenter.net/iau/MPCORB/MPCORB.DAT.gz'
@@ -56,19 +60,36 @@ _MPCORB_CONVERTERS = {
     'hex_flags': str,
 }
 
-def load_mpcorb_dataframe(fobj):
+_MPCORB_FAST_COLUMNS = (
+    'designation_packed', 'magnitude_H', 'magnitude_G', 'epoch_packed',
+    'mean_anomaly_degrees', 'argument_of_perihelion_degrees',
+    'longitude_of_ascending_node_degrees', 'inclination_degrees',
+    'eccentricity', 'mean_daily_motion_degrees', 'semimajor_axis_au',
+    'designation',
+)
+_MPCORB_SEP = '\x1E'
+
+_fast_mpcorb_re = None
+_fast_mpcorb_sub = None
+
+def load_mpcorb_dataframe(fobj, slow=True):
     """Parse a Minor Planet Center orbits file into a Pandas dataframe.
 
     See :doc:`kepler-orbits`.  The MPCORB file format is documented at:
     https://minorplanetcenter.net/iau/info/MPOrbitFormat.html
 
+    If you pass ``slow=False``, then a much faster parser reads only the
+    columns that are needed to compute orbits, plus the magnitudes and
+    designations; it also accepts the file’s text header and gzip
+    compression, so it can read ``MPCORB.DAT.gz`` just as downloaded.
+
     """
+    if not slow:
+        return _load_mpcorb_dataframe_fast(fobj)
+
     # See https://github.com/pandas-dev/pandas/issues/18035
     fobj = io.TextIOWrapper(fobj)
     columns = _MPCORB_COLUMNS
-    # if not slow:
-    #     keepers = _MPCORB_NECESSARY_COLUMNS
-    #     columns = [tup for tup in columns if tup[0] in keepers]
     names, colspecs = zip(*columns)
     df = pd.read_fwf(
         fobj, colspecs=colspecs, names=names,
@@ -77,6 +98,74 @@ def load_mpcorb_dataframe(fobj):
     )
     return df
 
+def _load_mpcorb_dataframe_fast(fobj):
+    global _fast_mpcorb_re, _fast_mpcorb_sub
+
+    text = fobj.read()
+    if text[:2] == b'\x1f\x8b':
+        text = zlib.decompress(text, 16 + zlib.MAX_WBITS)
+
+    # The full file starts with a text header that ends with a line of
+    # dashes; the orbits start on the line after.
+    match = re.search(b'^-{20,}\r?$', text[:10000], re.M)
+    if match is not None:
+        text = text[match.end():]
+
+    if _fast_mpcorb_re is None:
+        # Like `load_comets_dataframe()`, turn the fixed-width file into
+        # a CSV that Pandas can import efficiently.
+        keepers = set(_MPCORB_FAST_COLUMNS)
+        pat = ['^']
+        previous_end = 0
+        for name, (start, end) in _MPCORB_COLUMNS:
+            pat.append('.' * (start - previous_end))
+            if name == 'designation':
+                pat.append('(.{0,28}).*$')
+                break
+            elif name in keepers:
+                pat.append('(' + '.' * (end - start) + ')')
+            else:
+                pat.append('.' * (end - start))
+            previous_end = end
+
+        pat = ''.join(pat)
+        sub = _MPCORB_SEP.join('\\{}'.format(i + 1)
+                               for i in range(len(keepers)))
+
+        _fast_mpcorb_re = re.compile(pat.encode('ascii'), re.M)
+        _fast_mpcorb_sub = sub.encode('ascii')
+
+    text = _fast_mpcorb_re.sub(_fast_mpcorb_sub, text)
+    df = pd.read_csv(io.BytesIO(text), sep=_MPCORB_SEP, header=None,
+                     names=_MPCORB_FAST_COLUMNS,
+                     dtype={'designation_packed': str, 'epoch_packed': str,
+                            'designation': str})
+    df['designation_packed'] = df['designation_packed'].str.strip()
+    df['designation'] = df['designation'].str.strip()
+    return df
+
+def load_mpcorb_columns(path, columns=None, magnitude_limit=None):
+    """Load an MPCORB file quickly through an on-disk cache of its columns.
+
+    The first time this is called for a given file, which may be the
+    full ``MPCORB.DAT.gz`` just as downloaded, it is parsed with
+    ``load_mpcorb_dataframe(f, slow=False)`` and its columns are saved
+    as NumPy ``.npy`` files in a directory named with a ``.columns``
+    suffix alongside it, sorted from brightest to faintest absolute
+    magnitude ``magnitude_H``.  Later calls memory-map the cache instead
+    of parsing the text, and the cache is rebuilt automatically if the
+    file is modified, so a daily download is parsed only once.
+
+    Returns a dictionary mapping column names to NumPy arrays, which can
+    be passed straight to :func:`mpcorb_orbits()`.  To avoid reading
+    data you don’t need, ask for only a subset of ``columns``, or supply
+    a ``magnitude_limit`` to receive only minor planets at least that
+    bright.
+
+    """
+    return load_cached_columns(path, _load_mpcorb_dataframe_fast, None,
+                               columns, magnitude_limit, 'magnitude_H')
+
 def mpcorb_orbit(row, ts, gm_km3_s2):
     a = row.semimajor_axis_au
     e = row.eccentricity
@@ -109,6 +198,47 @@ def mpcorb_orbit(row, ts, gm_km3_s2):
     minor_planet._rotation = inertial_frames['ECLIPJ2000'].T
     return minor_planet
 
+def mpcorb_orbits(rows, ts, gm_km3_s2):
+    """Build a single orbit for every minor planet in an MPCORB dataframe.
+
+    Returns one vector function whose ``at()`` method computes the
+    positions of all of the minor planets at once, each position vector
+    with one column per row of the dataframe.  Its ``target`` is the
+    dataframe’s ``designation`` column.  Instead of a dataframe, you can
+    also pass the dictionary of columns returned by
+    :func:`load_mpcorb_columns()`.  See :doc:`kepler-orbits`.
+
+    """
+    a = _unwrap(rows['semimajor_axis_au'])
+    e = _unwrap(rows['eccentricity'])
+    p = a * (1.0 - e*e)
+
+    epoch_jd = _unpack_epochs(_unwrap(rows['epoch_packed']))
+    t_epoch = ts.tt_jd(epoch_jd)
+
+    minor_planets = _KeplerOrbit._from_mean_anomaly(
+        p,
+        e,
+        _unwrap(rows['inclination_degrees']),
+        _unwrap(rows['longitude_of_ascending_node_degrees']),
+        _unwrap(rows['argument_of_perihelion_degrees']),
+        _unwrap(rows['mean_anomaly_degrees']),
+        t_epoch,
+        gm_km3_s2,
+        10,
+        rows['designation'],
+    )
+    minor_planets._rotation = inertial_frames['ECLIPJ2000'].T
+    return minor_planets
+
+def _unpack_epochs(epoch_packed):
+    """Decode an array of packed MPC dates like ``K205V`` to Julian dates."""
+    codes = np.asarray(epoch_packed, dtype='S5')
+    digits = codes.view(np.uint8).reshape(len(codes), 5).astype(int)
+    digits -= np.where(digits <= ord('9'), ord('0'), ord('A') - 10)
+    year = 100 * digits[:,0] + 10 * digits[:,1] + digits[:,2]
+    return julian_day(year, digits[:,3], digits[:,4]) - 0.5
+
 COMET_URL = 'https://www.minorplanetcenter.net/iau/MPCORB/CometEls.txt'
 
 _COMET_COLUMNS = [
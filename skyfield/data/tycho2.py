@@ -1,3 +1,5 @@
+from .columnar import load_cached_columns
+
 URL = 'https://cdsarc.u-strasbg.fr/ftp/cats/I/239/tyc_main.dat'
 
 PANDAS_MESSAGE = """Skyfield needs Pandas to load the Tycho2 catalog
@@ -49,3 +51,13 @@ def load_dataframe(fobj):
         epoch_year = 1991.25,
     )
     return df.set_index('tyc')
+
+def load_columns(path, columns=None, magnitude_limit=None):
+    """Load ``tyc_main.dat`` through an on-disk cache of its columns.
+
+    See :func:`~skyfield.data.columnar.load_cached_columns()`; the
+    catalog number is returned as the column ``'tyc'``.
+
+    """
+    return load_cached_columns(path, load_dataframe, 'tyc',
+                               columns, magnitude_limit)
@@ -3,11 +3,16 @@
 
 from __future__ import division
 
-from numpy import arcsin, byte
-from .constants import AU_KM, C_AUDAY, ERAD
-from .functions import angle_between, length_of
-from .searchlib import find_maxima
+from weakref import WeakKeyDictionary
+from numpy import (
+    arange, arccos, arcsin, arctan2, array, byte, clip, concatenate,
+    copysign, cos, errstate, floor, hypot, minimum, nan, pi, polyfit,
+    searchsorted, sin, sqrt, tan, unwrap, where, zeros,
+)
+from .constants import AU_KM, C_AUDAY, DAY_S, ERAD, tau
+from .functions import angle_between, dots, length_of, mxv
 from .relativity import add_aberration
+from .toposlib import wgs84
 
 LUNAR_ECLIPSES = [
     'Penumbral',
@@ -15,6 +20,39 @@ LUNAR_ECLIPSES = [
     'Total',
 ]
 
+SOLAR_ECLIPSES = [
+    'Partial',
+    'Annular',
+    'Total',
+]
+
+_SOLAR_RADIUS_KM = 696340.0
+_MOON_RADIUS_KM = 1737.1
+_ERAD_KM = ERAD / 1e3
+
+# The radius of the Moon, in Earth radii, that the Besselian elements
+# published by NASA use for the penumbra and for the umbra.
+_K1 = 0.2725076
+_K2 = 0.272281
+
+# Offsets in hours, around an eclipse, at which we sample the geometry
+# before fitting the cubic polynomials of its Besselian elements.
+_FIT_HOURS = arange(-3.0, 4.0)
+
+# The mean length of a lunation, and the date of a mean New Moon, from
+# Meeus, Astronomical Algorithms, chapter 49.
+_LUNATION_DAYS = 29.530588861
+_NEW_MOON_TT = 2451550.09766
+
+# The square of the eccentricity of the WGS84 ellipsoid.
+_F = 1.0 / wgs84.inverse_flattening
+_E2 = 2.0 * _F - _F * _F
+
+# For each ephemeris, the lunation number of its first cached New Moon
+# or Full Moon, and the TT dates of the New or Full Moons that follow.
+_new_moon_cache = WeakKeyDictionary()
+_full_moon_cache = WeakKeyDictionary()
+
 def lunar_eclipses(start_time, end_time, eph):
     """Return the lunar eclipses between ``start_time`` and ``end_time``.
 
@@ -29,47 +67,20 @@ def lunar_eclipses(start_time, end_time, eph):
     of how to call this function.
 
     """
-    # Calls to the inner function `f()` from `find_maxima()` incur most
-    # of the expense of this routine, so we use raw ephemeris segments.
-    # This (a) avoids computing velocities we won't use (calls to `at()`
-    # always compute velocity), and (b) avoids computing any segments
-    # twice.
+    # Calls to the inner function `f()` that finds each Full Moon incur
+    # most of the expense of this routine, so we use raw ephemeris
+    # segments.  This (a) avoids computing velocities we won't use
+    # (calls to `at()` always compute velocity), and (b) avoids
+    # computing any segments twice.  The Full Moons are also cached.
     #
     # Note that we neglect light-travel time between the Earth and Moon,
     # and also light travel time from the Sun: the Sun moves so slowly
     # that a few minutes of difference in its position does not
     # meaningfully affect our eclipse predictions.
 
-    sdict = dict(((s.center, s.target), s.spk_segment) for s in eph.segments)
-    sun = sdict[0,10]
-    earth_barycenter = sdict[0,3]
-    earth = sdict[3,399]
-    moon = sdict[3,301]
-
-    def f(t):
-        jd, fr = t.whole, t.tdb_fraction
-        b, velocity = earth_barycenter.compute_and_differentiate(jd, fr)
-        e = earth.compute(jd, fr)
-        m = moon.compute(jd, fr)
-        s = sun.compute(jd, fr)
-
-        earth_to_sun = s - b - e
-        earth_to_moon = m - e
-
-        # The aberration routine requires specific units.  (We can leave
-        # the `earth_to_moon` vector unconverted because we only need
-        # its direction.)  We approximate the Earth’s velocity as being
-        # that of the Earth-Moon barycenter.
-
-        earth_to_sun /= AU_KM
-        velocity /= AU_KM
-        light_travel_time = length_of(earth_to_sun) / C_AUDAY
-        add_aberration(earth_to_sun, velocity, light_travel_time)
-
-        return angle_between(earth_to_sun, earth_to_moon)
-
-    f.step_days = 5.0
-    t, y = find_maxima(start_time, end_time, f, num=4)
+    earth_barycenter, earth, moon, sun = _segments(eph)
+    ts = start_time.ts
+    t = ts.tt_jd(_syzygies(eph, ts, start_time.tt, end_time.tt, pi))
 
     jd, fr = t.whole, t.tdb_fraction
     b = earth_barycenter.compute(jd, fr)
@@ -80,18 +91,15 @@ def lunar_eclipses(start_time, end_time, eph):
     earth_to_sun = s - b - e
     moon_to_earth = e - m
 
-    solar_radius_km = 696340.0
-    moon_radius_km = 1737.1
-
     # Strict geometry would demand that `arcsin()` be applied to these
     # three values, but the angles are small enough that no eclipse
     # prediction seems to be affected.
     pi_m = ERAD / 1e3 / length_of(moon_to_earth)
     pi_s = ERAD / 1e3 / length_of(earth_to_sun)
-    s_s = solar_radius_km / length_of(earth_to_sun)
+    s_s = _SOLAR_RADIUS_KM / length_of(earth_to_sun)
 
     closest_approach = angle_between(earth_to_sun, moon_to_earth)
-    moon_radius = arcsin(moon_radius_km / length_of(moon_to_earth))
+    moon_radius = arcsin(_MOON_RADIUS_KM / length_of(moon_to_earth))
 
     # Use Danjon's method for calculating enlargement of Earth's shadow.
     # See https://eclipse.gsfc.nasa.gov/LEcat5/shadow.html
@@ -132,3 +140,360 @@ def lunar_eclipses(start_time, end_time, eph):
     }
 
     return t, code, details
+
+def solar_eclipses(start_time, end_time, eph):
+    """Return the solar eclipses between ``start_time`` and ``end_time``.
+
+    Returns a three-item tuple:
+
+    * A :class:`~skyfield.timelib.Time` giving the moment of greatest
+      eclipse, when the axis of the Moon’s shadow passes closest to the
+      center of the Earth.
+    * An integer array of codes identifying how complete each eclipse is.
+    * A dictionary of further supplementary details about each eclipse.
+
+    Each eclipse is classified from its Besselian elements, computed as
+    described in the Explanatory Supplement to the Astronomical Almanac
+    11.3, and which you can retrieve for any eclipse by passing its time
+    to :func:`besselian_elements()`.  See `solar-eclipses` for the
+    details of how to call this function.
+
+    """
+    # As in `lunar_eclipses()`, we search using raw ephemeris segments.
+    earth_barycenter, earth, moon, sun = _segments(eph)
+    ts = start_time.ts
+    t = ts.tt_jd(_syzygies(eph, ts, start_time.tt, end_time.tt, 0.0))
+    y = _sun_moon_angle(earth_barycenter, earth, moon, sun)(t)
+
+    # Keep only the conjunctions at which the Moon could overlap the
+    # Sun as seen from somewhere on the Earth.
+    jd, fr = t.whole, t.tdb_fraction
+    b = earth_barycenter.compute(jd, fr)
+    e = earth.compute(jd, fr)
+    m = moon.compute(jd, fr)
+    s = sun.compute(jd, fr)
+    earth_to_sun = length_of(s - b - e)
+    earth_to_moon = length_of(m - e)
+    reach = (_ERAD_KM / earth_to_moon + _SOLAR_RADIUS_KM / earth_to_sun
+             + arcsin(_MOON_RADIUS_KM / earth_to_moon))
+    t = t[y < reach * 1.01]
+
+    c = _besselian_fit(t, eph)
+
+    # Step each time forward to greatest eclipse.
+    hours = zeros(t.shape)
+    for i in range(3):
+        x, dx = _evaluate(c[:,0], hours)
+        y, dy = _evaluate(c[:,1], hours)
+        hours -= (x * dx + y * dy) / (dx * dx + dy * dy)
+    (x, y, d, l1, l2, mu, tan_f1, tan_f2), _ = _evaluate(c, hours)
+
+    # Stretch the Earth's flattened disk on the fundamental plane back
+    # into a circle, to learn where the shadow axis meets its surface.
+    rho1 = sqrt(1.0 - _E2 * cos(d) ** 2)
+    y1 = y / rho1
+    gamma1 = hypot(x, y1)
+    zeta = sqrt(clip(1.0 - gamma1 * gamma1, 0.0, None))
+    L1 = l1 - zeta * tan_f1
+    L2 = l2 - zeta * tan_f2
+
+    eclipse = gamma1 < 1.0 + L1
+    umbral = gamma1 < 1.0 + abs(L2)
+    code = where(umbral, where(L2 < 0.0, 2, 1), 0).astype(byte)
+    magnitude = where(gamma1 < 1.0, (L1 - L2) / (L1 + L2),
+                      (L1 - gamma1 + 1.0) / (L1 + L2))
+
+    t = ts.tt_jd(t.tt[eclipse] + hours[eclipse] / 24.0)
+    details = {
+        'gamma': copysign(hypot(x, y), y)[eclipse],
+        'magnitude': magnitude[eclipse],
+    }
+    return t, code[eclipse], details
+
+def besselian_elements(t, eph):
+    """Return the Besselian elements of the solar eclipse at time ``t``.
+
+    Computes the geometry of the Moon’s shadow at hourly intervals from
+    three hours before to three hours after the time ``t``, which should
+    be a moment of greatest eclipse like those returned by
+    :func:`solar_eclipses()`, and returns a `BesselianElements` object
+    whose cubic polynomials describe the shadow throughout the eclipse.
+
+    """
+    c = _besselian_fit(t.ts.tt_jd(array([t.tt])), eph)
+    return BesselianElements(t, c[:,:,0])
+
+class BesselianElements(object):
+    """The Besselian elements of a solar eclipse.
+
+    Each element is an array of four polynomial coefficients, constant
+    term first, in powers of hours since the time ``t0``.  Distances
+    are in units of the Earth’s equatorial radius, and angles are in
+    radians:
+
+    * ``x``, ``y`` — Position of the shadow axis on the fundamental plane.
+    * ``d`` — Declination of the shadow axis.
+    * ``mu`` — Greenwich hour angle of the shadow axis.
+    * ``l1``, ``l2`` — Radii of the penumbra and umbra on the
+      fundamental plane; ``l2`` is negative when the eclipse is total.
+    * ``tan_f1``, ``tan_f2`` — Slopes of the penumbral and umbral cones.
+
+    """
+    names = 'x', 'y', 'd', 'l1', 'l2', 'mu', 'tan_f1', 'tan_f2'
+
+    def __init__(self, t0, coefficients):
+        self.t0 = t0
+        self._coefficients = coefficients
+        for name, c in zip(self.names, coefficients.T):
+            setattr(self, name, c)
+
+    def __repr__(self):
+        return '<{0} of the eclipse of {1}>'.format(
+            type(self).__name__, self.t0.utc_strftime('%Y-%m-%d'))
+
+    def local_circumstances(self, topos):
+        """Return the circumstances of the eclipse at one or more places.
+
+        ``topos`` is a geographic position, like one returned by
+        ``wgs84.latlon()``, whose latitude and longitude can be arrays.
+        Returns a three-item tuple, whose arrays all have the shape of
+        the latitude and longitude arrays:
+
+        * A :class:`~skyfield.timelib.Time` giving each place’s moment
+          of maximum eclipse.
+        * An integer array of codes, indexing into ``SOLAR_ECLIPSES``,
+          that say how complete the eclipse is at each place; the code
+          is -1 where the Moon’s shadow never reaches.
+        * A dictionary of further details, with the ``magnitude`` and
+          ``obscuration`` at maximum eclipse, the Sun’s
+          ``altitude_degrees`` at maximum eclipse, and the TT dates of
+          the contacts ``partial_begin_tt``, ``central_begin_tt``,
+          ``central_end_tt``, and ``partial_end_tt`` — or ``nan`` for
+          contacts that do not occur at a place.
+
+        The Sun’s altitude is not taken into account, so check it to
+        learn whether each place can actually see the eclipse.
+
+        """
+        xyz = topos.itrs_xyz.km / _ERAD_KM
+        rho_cos = hypot(xyz[0], xyz[1])
+        rho_sin = xyz[2]
+        longitude = arctan2(xyz[1], xyz[0])
+        shape = rho_cos.shape
+        c = self._coefficients.reshape((4, 8) + (1,) * len(shape))
+
+        def state(hours):
+            (x, y, d, l1, l2, mu, tan_f1, tan_f2), rate = _evaluate(c, hours)
+            dx, dy, dd, _, _, dmu, _, _ = rate
+            H = mu + longitude
+            xi = rho_cos * sin(H)
+            eta = rho_sin * cos(d) - rho_cos * cos(H) * sin(d)
+            zeta = rho_sin * sin(d) + rho_cos * cos(H) * cos(d)
+            u = x - xi
+            v = y - eta
+            a = dx - dmu * rho_cos * cos(H)
+            b = dy - (dmu * xi * sin(d) - zeta * dd)
+            L1 = l1 - zeta * tan_f1
+            L2 = l2 - zeta * tan_f2
+            return u, v, a, b, L1, L2, d, H
+
+        hours = zeros(shape)
+        for i in range(5):
+            u, v, a, b, L1, L2, d, H = state(hours)
+            hours -= (u * a + v * b) / (a * a + b * b)
+        u, v, a, b, L1, L2, d, H = state(hours)
+        maximum = hours
+
+        m = hypot(u, v)
+        central = m < abs(L2)
+        magnitude = where(central, (L1 - L2) / (L1 + L2), (L1 - m) / (L1 + L2))
+        eclipse = magnitude > 0.0
+        code = where(central, where(L2 < 0.0, 2, 1), 0)
+        code = where(eclipse, code, -1)
+
+        # The fraction of the Sun's disk covered, from the area of the
+        # lens where the disks of the Sun and Moon overlap.
+        r_sun = (L1 + L2) / 2.0
+        r_moon = (L1 - L2) / 2.0
+        with errstate(divide='ignore', invalid='ignore'):
+            p = clip((m*m + r_sun*r_sun - r_moon*r_moon) / (2*m*r_sun), -1, 1)
+            q = clip((m*m + r_moon*r_moon - r_sun*r_sun) / (2*m*r_moon), -1, 1)
+            lens = (r_sun * r_sun * arccos(p) + r_moon * r_moon * arccos(q)
+                    - r_sun * m * sqrt(1.0 - p * p))
+        obscuration = where(central, minimum(r_moon / r_sun, 1.0) ** 2,
+                            lens / (tau / 2.0) / r_sun / r_sun)
+        obscuration = where(eclipse, obscuration, 0.0)
+
+        latitude = topos.latitude.radians
+        altitude = arcsin(sin(latitude) * sin(d)
+                          + cos(latitude) * cos(H) * cos(d))
+
+        def contact(sign, umbral):
+            hours = maximum.copy()
+            for i in range(5):
+                u, v, a, b, L1, L2, d, H = state(hours)
+                L = abs(L2) if umbral else L1
+                n = hypot(a, b)
+                with errstate(invalid='ignore'):
+                    S = (a * v - u * b) / (n * L)
+                    hours += (sign * L / n * sqrt(1.0 - S * S)
+                              - (u * a + v * b) / (n * n))
+            return hours
+
+        tt0 = self.t0.tt
+        details = {
+            'magnitude': where(eclipse, magnitude, 0.0),
+            'obscuration': obscuration,
+            'altitude_degrees': altitude / tau * 360.0,
+        }
+        for name, sign, umbral, ok in (
+                ('partial_begin_tt', -1.0, False, eclipse),
+                ('central_begin_tt', -1.0, True, central),
+                ('central_end_tt', 1.0, True, central),
+                ('partial_end_tt', 1.0, False, eclipse),
+        ):
+            hours = contact(sign, umbral)
+            details[name] = where(ok, tt0 + hours / 24.0, nan)
+
+        t = self.t0.ts.tt_jd(tt0 + maximum / 24.0)
+        return t, code, details
+
+def _segments(eph):
+    sdict = dict(((s.center, s.target), s.spk_segment) for s in eph.segments)
+    return sdict[0,3], sdict[3,399], sdict[3,301], sdict[0,10]
+
+def _syzygies(eph, ts, tt0, tt1, angle):
+    """Return the TT dates between ``tt0`` and ``tt1`` of New or Full Moons.
+
+    Here a New Moon is the moment the Sun and Moon are closest together
+    as seen from the geocenter, and a Full Moon the moment they are
+    farthest apart; ``angle`` is 0.0 to ask for New Moons and pi for
+    Full Moons.  The dates are cached for each ephemeris as they are
+    found, so that repeated searches, or a long catalog built a century
+    at a time, do not repeat the work.
+
+    """
+    cache = _full_moon_cache if angle else _new_moon_cache
+    mean_tt = _NEW_MOON_TT + angle / tau * _LUNATION_DAYS
+
+    # Every lunation whose mean New or Full Moon falls within a day of
+    # the range, since the true one might then fall within it.
+    k0 = int(floor((tt0 - 1.0 - mean_tt) / _LUNATION_DAYS)) + 1
+    k1 = int(floor((tt1 + 1.0 - mean_tt) / _LUNATION_DAYS)) + 1
+    k_start, tt = cache.get(eph, (k0, zeros(0)))
+    k_end = k_start + len(tt)
+    if k_end <= k0 or k1 <= k_start:
+        k_start, tt = k0, _find_syzygies(eph, ts, mean_tt, angle, k0, k1)
+    else:
+        if k0 < k_start:
+            earlier = _find_syzygies(eph, ts, mean_tt, angle, k0, k_start)
+            tt = concatenate([earlier, tt])
+            k_start = k0
+        if k_end < k1:
+            later = _find_syzygies(eph, ts, mean_tt, angle, k_end, k1)
+            tt = concatenate([tt, later])
+    cache[eph] = k_start, tt
+    return tt[searchsorted(tt, tt0):searchsorted(tt, tt1, 'right')]
+
+def _find_syzygies(eph, ts, mean_tt, angle, k0, k1):
+    """Find the New or Full Moons of lunations ``k0`` up to ``k1``.
+
+    Each search starts from the mean date, ``mean_tt`` plus a whole
+    number of lunations, which is never more than about 15 hours from
+    the true one.  Near its extreme, the Sun-Moon angle's distance from
+    ``angle`` grows nearly in proportion to time, so its square is close
+    to a parabola, whose minimum we find with Newton's method using
+    derivatives from finite differences.
+
+    """
+    f = _sun_moon_angle(*_segments(eph))
+    tt = mean_tt + arange(k0, k1) * _LUNATION_DAYS
+    h = 0.01
+    for i in range(8):
+        g0, g1, g2 = ((angle - f(ts.tt_jd(tt + dt))) ** 2 for dt in (-h, 0, h))
+        step = h * (g2 - g0) / 2.0 / (g2 - 2.0 * g1 + g0)
+        tt -= step
+        if abs(step).max() < 0.01 / DAY_S:
+            break
+    return tt
+
+def _sun_moon_angle(earth_barycenter, earth, moon, sun):
+    """Return a function of time giving the Sun-Moon angle at the geocenter."""
+    def f(t):
+        jd, fr = t.whole, t.tdb_fraction
+        b, velocity = earth_barycenter.compute_and_differentiate(jd, fr)
+        e = earth.compute(jd, fr)
+        m = moon.compute(jd, fr)
+        s = sun.compute(jd, fr)
+
+        earth_to_sun = s - b - e
+        earth_to_moon = m - e
+
+        # The aberration routine requires specific units.  (We can leave
+        # the `earth_to_moon` vector unconverted because we only need
+        # its direction.)  We approximate the Earth’s velocity as being
+        # that of the Earth-Moon barycenter.
+
+        earth_to_sun /= AU_KM
+        velocity /= AU_KM
+        light_travel_time = length_of(earth_to_sun) / C_AUDAY
+        add_aberration(earth_to_sun, velocity, light_travel_time)
+
+        return angle_between(earth_to_sun, earth_to_moon)
+
+    return f
+
+def _besselian_fit(t, eph):
+    """Fit Besselian elements around each time in the array ``t``.
+
+    Returns polynomial coefficients with shape (4, 8, n): the powers of
+    hours, constant term first; the elements, in the order of
+    `BesselianElements.names`; and the eclipses.
+
+    """
+    ts = t.ts
+    tt = (t.tt[:,None] + _FIT_HOURS / 24.0).flatten()
+    T = ts.tt_jd(tt)
+
+    # Geocentric apparent positions of the Sun and Moon, in Earth radii,
+    # referred to the true equator and equinox of date.
+    e = eph['earth'].at(T)
+    s = e.observe(eph['sun']).apparent().position.au
+    m = e.observe(eph['moon']).apparent().position.au
+    s = mxv(T.M, s) * (AU_KM / _ERAD_KM)
+    m = mxv(T.M, m) * (AU_KM / _ERAD_KM)
+
+    # Unit vectors along the shadow axis, and toward the east and north
+    # on the fundamental plane.
+    g = s - m
+    G = length_of(g)
+    k = g / G
+    a = arctan2(k[1], k[0])
+    d = arcsin(k[2])
+    i = array([-sin(a), cos(a), zeros(a.shape)])
+    j = array([-sin(d) * cos(a), -sin(d) * sin(a), cos(d)])
+
+    x = dots(m, i)
+    y = dots(m, j)
+    z = dots(m, k)
+
+    f1 = arcsin((_SOLAR_RADIUS_KM / _ERAD_KM + _K1) / G)
+    f2 = arcsin((_SOLAR_RADIUS_KM / _ERAD_KM - _K2) / G)
+    tan_f1 = tan(f1)
+    tan_f2 = tan(f2)
+    l1 = z * tan_f1 + _K1 / cos(f1)
+    l2 = z * tan_f2 - _K2 / cos(f2)
+    mu = T.gast / 24.0 * tau - a
+
+    n = len(t.tt)
+    samples = array([x, y, d, l1, l2, mu, tan_f1, tan_f2])
+    samples = samples.reshape(8, n, len(_FIT_HOURS))
+    samples[5] = unwrap(samples[5], axis=-1)
+    c = polyfit(_FIT_HOURS, samples.reshape(8 * n, -1).T, 3)
+    return c[::-1].reshape(4, 8, n)
+
+def _evaluate(c, hours):
+    """Evaluate polynomials, and their rates of change, at ``hours``."""
+    value = c[0] + hours * (c[1] + hours * (c[2] + hours * c[3]))
+    rate = c[1] + hours * (2.0 * c[2] + hours * 3.0 * c[3])
+    return value, rate
@@ -7,7 +7,7 @@ from .units import Distance, Angle, Velocity
 from .descriptorlib import reify
 from numpy import (array, arctan2, sin, arctan, tan, inf, repeat, float64,
                    sinh, sqrt, arccos, arctanh, zeros_like, ones_like, divide,
-                   where, pi, cross)
+                   where, pi, cross, empty, errstate)
 
 _DAY_S_SQUARED = DAY_S * DAY_S
 
@@ -28,6 +28,51 @@ def osculating_elements_of(position, reference_frame=None, gm_km3_s2=None):
     This function returns an instance of :class:`~skyfield.elementslib.OsculatingElements`
 
     """
+    position_vec, velocity_vec, gm_km3_s2 = _prepare(
+        position, reference_frame, gm_km3_s2)
+    return OsculatingElements(position_vec,
+                              velocity_vec,
+                              position.t,
+                              gm_km3_s2)
+
+
+def osculating_elements_array(position, reference_frame=None, gm_km3_s2=None):
+    """Compute every osculating element at once, as a NumPy record array.
+
+    Takes the same arguments as :func:`osculating_elements_of()`, but
+    instead of computing each element lazily, it computes them all in a
+    single vectorized pass that shares the angular momentum, node, and
+    eccentricity vectors among them.  This is much faster when you need
+    several elements for many thousands of positions at once.
+
+    Returns a structured array with one record per position, with
+    distances in kilometers, angles in radians, the mean motion in
+    radians per day, the period in days, and the time of periapsis as a
+    TDB Julian date.  Its fields are:
+
+    ``semi_latus_rectum_km``, ``semi_major_axis_km``,
+    ``semi_minor_axis_km``, ``periapsis_distance_km``,
+    ``apoapsis_distance_km``, ``eccentricity``, ``inclination``,
+    ``longitude_of_ascending_node``, ``argument_of_periapsis``,
+    ``longitude_of_periapsis``, ``true_anomaly``,
+    ``eccentric_anomaly``, ``mean_anomaly``, ``argument_of_latitude``,
+    ``true_longitude``, ``mean_longitude``, ``mean_motion_per_day``,
+    ``period_in_days``, and ``periapsis_time_tdb``.
+
+    """
+    position_vec, velocity_vec, gm_km3_s2 = _prepare(
+        position, reference_frame, gm_km3_s2)
+    if gm_km3_s2 <= 0:
+        raise ValueError('`gm_km3_s2` (the standard gravitational parameter '
+                         'in km^3/s^2) must be positive and non-zero')
+    shape = position_vec.km.shape[1:]
+    r_vec = position_vec.km.reshape(3, -1)
+    v_vec = velocity_vec.km_per_s.reshape(3, -1)
+    tdb = position.t.tdb * ones_like(r_vec[0])
+    return _elements_array(r_vec, v_vec, tdb, gm_km3_s2).reshape(shape)
+
+
+def _prepare(position, reference_frame, gm_km3_s2):
     if gm_km3_s2 is None:
         if not isinstance(position.center, int):
             raise ValueError('Skyfield is unable to calculate a value for GM. You'
@@ -48,10 +93,7 @@ def osculating_elements_of(position, reference_frame=None, gm_km3_s2=None):
         position_vec = position.position
         velocity_vec = position.velocity
 
-    return OsculatingElements(position_vec,
-                              velocity_vec,
-                              position.t,
-                              gm_km3_s2)
+    return position_vec, velocity_vec, gm_km3_s2
 
 
 class OsculatingElements(object):
@@ -469,3 +511,116 @@ def true_anomaly(e_vec, pos_vec, vel_vec, n_vec):
         v[inds] = normpi(v[inds])
 
         return v
+
+
+_ELEMENT_FIELDS = [
+    'semi_latus_rectum_km', 'semi_major_axis_km', 'semi_minor_axis_km',
+    'periapsis_distance_km', 'apoapsis_distance_km', 'eccentricity',
+    'inclination', 'longitude_of_ascending_node', 'argument_of_periapsis',
+    'longitude_of_periapsis', 'true_anomaly', 'eccentric_anomaly',
+    'mean_anomaly', 'argument_of_latitude', 'true_longitude',
+    'mean_longitude', 'mean_motion_per_day', 'period_in_days',
+    'periapsis_time_tdb',
+]
+
+def _elements_array(pos_vec, vel_vec, tdb, mu):
+    """Fused equivalent of the routines above, for (3, n) vectors.
+
+    The cheap branches of the routines above become ``where()`` calls
+    over the whole array, with degenerate vectors swapped for the x-axis
+    so that every branch can be computed everywhere without dividing by
+    zero; the costly anomaly branches still work on masked subsets.
+
+    """
+    mu_km_d = mu * _DAY_S_SQUARED
+    x_axis = array([1.0, 0.0, 0.0])[:,None]
+
+    h_vec = cross(pos_vec, vel_vec, 0, 0).T
+    r = length_of(pos_vec)
+    rv = dots(pos_vec, vel_vec)
+    e_vec = ((length_of(vel_vec)**2 - mu/r)*pos_vec - rv*vel_vec)/mu
+    e = length_of(e_vec)
+
+    n_vec = array([-h_vec[1], h_vec[0], zeros_like(h_vec[0])])
+    n = length_of(n_vec)
+    equatorial = (n == 0)
+    circular = (e < 1e-15)
+    n_vec = where(equatorial, x_axis, n_vec / where(equatorial, 1.0, n))
+    e_ref = where(circular, x_axis, e_vec)
+
+    i = angle_between(h_vec, array([0.0, 0.0, 1.0])[:,None])
+    Om = where(i != 0, arctan2(h_vec[0], -h_vec[1]) % tau, 0.0)
+
+    angle = where(equatorial, arctan2(e_vec[1], e_vec[0]) % tau,
+                  angle_between(n_vec, e_ref))
+    condition = where(equatorial, h_vec[2] >= 0, e_vec[2] > 0)
+    w = where(circular, 0.0, where(condition, angle, -angle % tau))
+
+    # Measure the true anomaly from periapsis, or else from the node, or
+    # else, for circular equatorial orbits, from the x-axis.
+    angle = angle_between(where(circular, n_vec, e_vec), pos_vec)
+    condition = where(~circular, rv > 0,
+                      where(equatorial, vel_vec[0] < 0, pos_vec[2] >= 0))
+    v = where(condition, angle, -angle % tau)
+    inds = e > 1 - 1e-15
+    v[inds] = normpi(v[inds])
+
+    p = length_of(h_vec)**2/mu
+    elliptical = e < 1
+    hyperbolic = e > 1
+    parabolic = ~elliptical & ~hyperbolic
+    with errstate(divide='ignore', invalid='ignore', over='ignore'):
+        one_minus_e2 = 1 - e**2
+        a = where(parabolic, inf, p / one_minus_e2)
+        b = where(elliptical, p/sqrt(one_minus_e2),
+                  where(hyperbolic, p*sqrt(-one_minus_e2) / one_minus_e2, 0.0))
+        q = where(parabolic, p/2, p*(1-e) / one_minus_e2)
+        Q = where(e < 1 - 1e-15, p*(1+e) / one_minus_e2, inf)
+
+        mean_motion = sqrt(mu/abs(a)**3)
+        period = where(a > 0, tau*sqrt(a**3/mu), inf)
+
+    # Only the few hyperbolic orbits in a typical array need the slower
+    # hyperbolic functions, so give them their own small arrays.
+    half_tan = tan(v/2)
+    E = zeros_like(e)
+    M = zeros_like(e)
+    inds = elliptical
+    E[inds] = 2*arctan(sqrt((1-e[inds])/(1+e[inds])) * half_tan[inds])
+    M[inds] = (E[inds] - e[inds]*sin(E[inds])) % tau
+    inds = hyperbolic
+    E[inds] = normpi(2*arctanh(half_tan[inds]
+                               / sqrt((e[inds]+1)/(e[inds]-1))))
+    M[inds] = e[inds]*sinh(E[inds]) - E[inds]
+
+    # The time since periapsis uses the unshifted mean anomaly.
+    n = mean_motion * DAY_S
+    inds = n < 8.64e-15
+    tp = divide(M, n, out=zeros_like(p), where=~inds)
+    D = half_tan[inds]
+    tp[inds] = sqrt(2*(p[inds]/2)**3/mu_km_d)*(D + D**3/3)
+
+    inds = hyperbolic
+    M[inds] = normpi(M[inds])
+
+    elements = empty(len(r), [(name, float64) for name in _ELEMENT_FIELDS])
+    elements['semi_latus_rectum_km'] = p
+    elements['semi_major_axis_km'] = a
+    elements['semi_minor_axis_km'] = b
+    elements['periapsis_distance_km'] = q
+    elements['apoapsis_distance_km'] = Q
+    elements['eccentricity'] = e
+    elements['inclination'] = i
+    elements['longitude_of_ascending_node'] = Om
+    elements['argument_of_periapsis'] = w
+    elements['longitude_of_periapsis'] = (Om + w) % tau
+    elements['true_anomaly'] = v
+    elements['eccentric_anomaly'] = E
+    elements['mean_anomaly'] = M
+    elements['argument_of_latitude'] = (w + v) % tau
+    elements['true_longitude'] = (Om + w + v) % tau
+    elements['mean_longitude'] = (Om + w + M) % tau
+    elements['mean_motion_per_day'] = n
+    elements['period_in_days'] = period / DAY_S
+    elements['periapsis_time_tdb'] = tdb - tp
+    return elements
@@ -47,6 +47,24 @@ def mxmxm(M1, M2, M3):
 
 _T, _mxv, _mxm, _mxmxm = T, mxv, mxm, mxmxm  # In case anyone imported old name
 
+def _sites_mxv(M, v):
+    """Multiply matrices `M` by each vector in an array of site vectors.
+
+    Unlike :func:`mxv()`, which pairs each matrix with a vector, this
+    multiplies every site vector `v` by every matrix: the result has the
+    site dimensions of `v` followed by the extra dimensions of `M`.
+
+    """
+    sites = v.shape[1:]
+    product = einsum('ij...,jn->in...', M, v.reshape(3, -1))
+    return product.reshape((3,) + sites + M.shape[2:])
+
+def _sites_mxm(A, M):
+    """Multiply each of an array of site matrices `A` by matrices `M`."""
+    sites = A.shape[2:]
+    product = einsum('ijn,jk...->ikn...', A.reshape(3, 3, -1), M)
+    return product.reshape((3, 3) + sites + M.shape[2:])
+
 def length_of(xyz):
     """Given a 3-element array |xyz|, return its length.
 
@@ -171,6 +189,21 @@ def _to_array(value):
     else:
         return float64(value)
 
+def _broadcast_sites(a, b):
+    """Give two |xyz| vectors the same dimensions, to add or subtract them.
+
+    A vector function for an array of sites returns positions with extra
+    dimensions for the sites, ahead of any for time, so a vector without
+    them gets new axes of length 1 in their place.
+
+    """
+    extra = getattr(b, 'ndim', 0) - getattr(a, 'ndim', 0)
+    if extra > 0 and getattr(a, 'ndim', 0):
+        a = a.reshape(a.shape[:1] + (1,) * extra + a.shape[1:])
+    elif extra < 0 and getattr(b, 'ndim', 0):
+        b = b.reshape(b.shape[:1] + (1,) * -extra + b.shape[1:])
+    return a, b
+
 def _reconcile(a, b):
     """Coerce two NumPy generics-or-arrays to the same number of dimensions."""
     an = getattr(a, 'ndim', 0)
@@ -4,9 +4,9 @@ import sys
 import math
 from numpy import (
     abs, amax, amin, arange, arccos, arctan, array, atleast_1d,
-    clip, copy, copyto, cos, cosh, exp, full_like, log, ndarray, newaxis,
-    pi, power, repeat, sign, sin, sinh, squeeze, sqrt, sum,
-    tan, tanh, zeros_like,
+    broadcast_arrays, clip, copyto, cos, cosh, empty, empty_like, errstate,
+    exp, log, ndarray, newaxis, nonzero, pi, power, repeat, sign, sin, sinh,
+    squeeze, sqrt, sum, tan, tanh, where, zeros_like,
 )
 from skyfield.constants import AU_KM, DAY_S, DEG2RAD
 from skyfield.functions import dots, length_of, mxv
@@ -19,6 +19,12 @@ from skyfield.sgp4lib import _cross
 _CONVERT_GM = DAY_S * DAY_S / AU_KM / AU_KM / AU_KM
 
 class _KeplerOrbit(VectorFunction):
+    # Scratch memory allowed for each tile of orbits and times, and an
+    # optional ``concurrent.futures`` executor to run the tiles; both
+    # can be overridden on an orbit.  See `propagate_in_tiles()`.
+    memory_bytes = 256 * 1024 * 1024
+    executor = None
+
     def __init__(self,
                  position,
                  velocity,
@@ -190,7 +196,10 @@ class _KeplerOrbit(VectorFunction):
         """
         M = DEG2RAD * mean_anomaly_degrees
         gm_au3_d2 = gm_km3_s2 * _CONVERT_GM
-        if eccentricity < 1.0:
+        if isinstance(eccentricity, ndarray):
+            v = _true_anomalies(semilatus_rectum_au, eccentricity,
+                                gm_au3_d2, M)
+        elif eccentricity < 1.0:
             E = eccentric_anomaly(eccentricity, M)
             v = true_anomaly_closed(eccentricity, E)
         elif eccentricity > 1.0:
@@ -222,12 +231,14 @@ class _KeplerOrbit(VectorFunction):
 
         The Time object can contain one time, or an array of times
         """
-        pos, vel = propagate(
+        pos, vel = propagate_in_tiles(
             self.position_at_epoch.au,
             self.velocity_at_epoch.au_per_d,
             self.epoch.tt,
             time.tt,
             self.mu_au3_d2,
+            self.memory_bytes,
+            self.executor,
         )
         if self._rotation is not None:
             pos = mxv(self._rotation, pos)
@@ -288,11 +299,28 @@ def eccentric_anomaly(e, M):
         f = E - f2 - M
         dE = f*f1 / (f1*f1 - 0.5*f*f2)
         E -= dE
-        if abs(dE) < 1e-14:
+        if amax(abs(dE)) < 1e-14:
             return E * sign_M
 
     raise ValueError('eccentric anomaly failed to converge')
 
+def _true_anomalies(p, e, gm, M):
+    """Return the true anomaly for each of an array of orbits."""
+    p, e, M = broadcast_arrays(p, e, M)
+    v = empty_like(M)
+    closed = e < 1.0
+    open_ = e > 1.0
+    parabolic = ~(closed | open_)
+    if closed.any():
+        ec = e[closed]
+        v[closed] = true_anomaly_closed(ec, eccentric_anomaly(ec, M[closed]))
+    if open_.any():
+        eo = e[open_]
+        v[open_] = true_anomaly_hyperbolic(eo, eccentric_anomaly(eo, M[open_]))
+    if parabolic.any():
+        v[parabolic] = true_anomaly_parabolic(p[parabolic], gm, M[parabolic])
+    return v
+
 def true_anomaly_hyperbolic(e, E):
     """Calculates true anomaly from eccentricity and eccentric anomaly.
 
@@ -395,6 +423,7 @@ def find_trunc():
 
 
 trunc = find_trunc()
+_MAX_ITERATIONS = 1000
 odd_factorials = array([math.factorial(i) for i in range(3, trunc*2, 2)])
 even_factorials = array([math.factorial(i) for i in range(2, trunc*2, 2)])
 exponents = arange(0, trunc-1)
@@ -440,7 +469,7 @@ def stumpff(x):
 
     return c0, c1, c2, c3
 
-def propagate(position, velocity, t0, t1, gm):
+def propagate(position, velocity, t0, t1, gm, return_iterations=False):
     """Propagates a position and velocity vector with an array of times.
 
     Based on the function toolkit/src/spicelib/prop2b.f from the SPICE toolkit,
@@ -458,6 +487,9 @@ def propagate(position, velocity, t0, t1, gm):
         Time or times to propagate to
     gm : float
         Gravitational parameter in units that match the other arguments
+    return_iterations : bool
+        Whether to also return, for each orbit and time, the number of
+        iterations the solver needed
     """
     gm = atleast_1d(gm)
     if (gm <= 0).any():
@@ -510,102 +542,115 @@ def propagate(position, velocity, t0, t1, gm):
     logbound = (log(1.5) + log(dpmax) - log(maxc[~hyperbolic])) / 3
     bound[~hyperbolic] = exp(logbound)
 
-    # each of these arrays has 1 entry per orbit, so its shape is (#orbits, 1)
-    f = f[:, newaxis]
-    bq = bq[:, newaxis]
-    b2rv = b2rv[:, newaxis]
-    br0 = br0[:, newaxis]
-    qovr0 = qovr0[:, newaxis]
-    bound = bound[:, newaxis]
-
-    def kepler(x):
-        _, c1, c2, c3 = stumpff(f*x*x)
-        return x*(br0*c1 + x*(b2rv*c2 + x*bq*c3))
-
-    def kepler_1d(x, orb_inds):
-        _, c1, c2, c3 = stumpff(x*x*repeat(f, orb_inds))
-        return x*(c1*repeat(br0, orb_inds) + x*(c2*repeat(b2rv, orb_inds) + x*(c3*repeat(bq, orb_inds))))
+    def kepler(x, o):
+        _, c1, c2, c3 = stumpff(f[o]*x*x)
+        return x*(br0[o]*c1 + x*(b2rv[o]*c2 + x*bq[o]*c3))
 
+    def check_progress(x, old_x, i, o):
+        if (x == old_x).any():
+            raise ValueError('The input delta time (dt) has a value of {0}.'
+                             'This is beyond the range of DT for which we '
+                             'can reliably propagate states. The limits for '
+                             'this GM and initial state are from {1} '
+                             'to {2}.'.format(dt[i], kepler(-bound[o], o),
+                                              kepler(bound[o], o)))
 
     t1 = atleast_1d(t1)
     t0 = atleast_1d(t0)
     if len(t0) == 1:
         t0 = repeat(t0, position.shape[1])
 
-    # shape of 2 dimensional arrays from here on out should be (#orbits, len(t1))
-    dt = t1 - t0[:, newaxis]
+    # The solver works on flat arrays with one entry per orbit and time,
+    # and `orbit` says which orbit each entry belongs to.  Each loop
+    # only touches the entries `i` still in need of work, so a few
+    # slow-converging orbits don't keep the whole batch iterating.
+    shape = (position.shape[1], len(t1))
+    dt = (t1 - t0[:, newaxis]).ravel()
+    orbit = repeat(arange(shape[0]), shape[1])
+    iterations = zeros_like(dt, dtype=int)
 
-    x = dt/bq
-    copyto(x, -bound, where=(x<-bound))
-    copyto(x, bound, where=(x>bound))
-
-    kfun = kepler(x)
+    x = clip(dt / bq[orbit], -bound[orbit], bound[orbit])
+    kfun = kepler(x, orbit)
 
     past = dt < 0
     future = dt > 0
+    upper = x * future
+    lower = x * past
+
+    # Widen each bracket until it contains the root.
+    i, = nonzero(past & (kfun > dt))
+    while len(i):
+        o = orbit[i]
+        upper[i] = lower[i]
+        lower[i] *= 2
+        old_x = x[i]
+        x[i] = clip(lower[i], -bound[o], bound[o])
+        check_progress(x[i], old_x, i, o)
+        kfun[i] = kepler(x[i], o)
+        iterations[i] += 1
+        i = i[kfun[i] > dt[i]]
+
+    i, = nonzero(future & (kfun < dt))
+    while len(i):
+        o = orbit[i]
+        lower[i] = upper[i]
+        upper[i] *= 2
+        old_x = x[i]
+        x[i] = clip(upper[i], -bound[o], bound[o])
+        check_progress(x[i], old_x, i, o)
+        kfun[i] = kepler(x[i], o)
+        iterations[i] += 1
+        i = i[kfun[i] < dt[i]]
+
+    # Then take Newton steps, falling back to bisection whenever a step
+    # would leave the bracket or would shrink it more slowly than
+    # bisection, until each root is pinned down.
+    x = upper.copy()
+    copyto(x, (upper + lower) / 2, where=(lower <= upper))
+    last_step = abs(upper - lower)
+    step_before = last_step.copy()
+
+    i, = nonzero((lower < x) & (x < upper))
+    while len(i):
+        o = orbit[i]
+        xi = x[i]
+        c0, c1, c2, c3 = stumpff(f[o]*xi*xi)
+        k = xi*(br0[o]*c1 + xi*(b2rv[o]*c2 + xi*bq[o]*c3))
+        dk = br0[o]*c0 + xi*(b2rv[o]*c1 + xi*bq[o]*c2)
+        d = dt[i]
+
+        high = k > d
+        low = k < d
+        lo = where(low, xi, lower[i])
+        up = where(high, xi, upper[i])
+        lower[i] = lo
+        upper[i] = up
+
+        with errstate(divide='ignore', invalid='ignore'):
+            step = xi - (k - d) / dk
+        newton = ((lo < step) & (step < up)
+                  & (abs(step - xi) <= 0.5 * step_before[i]))
+        new_x = where(newton, step, (lo + up) / 2)
+        copyto(new_x, xi, where=~(high | low))
+        step_before[i] = last_step[i]
+        last_step[i] = abs(new_x - xi)
+        x[i] = new_x
+        iterations[i] += 1
+
+        still_going = ((new_x != xi) & (lo < new_x) & (new_x < up)
+                       & (iterations[i] < _MAX_ITERATIONS))
+        i = i[still_going]
 
-    upper = zeros_like(dt, dtype='float64')
-    lower = zeros_like(dt, dtype='float64')
-    oldx = zeros_like(dt, dtype='float64')
-
-    copyto(lower, x, where=past)
-    copyto(upper, x, where=future)
-
-    while (kfun[past] > dt[past]).any():
-        copyto(upper, lower, where=past)
-        lower[past] *= 2
-        copyto(oldx, x, where=past)
-        orb_ind = sum(past, axis=1)
-        x[past] = clip(lower[past], repeat(-bound, orb_ind), repeat(bound, orb_ind))
-        if (x[past] == oldx[past]).any():
-            raise ValueError('The input delta time (dt) has a value of {0}.'
-                             'This is beyond the range of DT for which we '
-                             'can reliably propagate states. The limits for '
-                             'this GM and initial state are from {1}'
-                             'to {2}.'.format(dt, kepler(-bound), kepler(bound)))
-        kfun[past] = kepler_1d(x[past], orb_ind)
-
-    while (kfun[future] < dt[future]).any():
-        copyto(lower, upper, where=future)
-        upper[future] *= 2
-        copyto(oldx, x, where=future)
-        orb_ind = sum(future, axis=1)
-        x[future] = clip(upper[future], repeat(-bound, orb_ind), repeat(bound, orb_ind))
-        if (x[future] == oldx[future]).any():
-            raise ValueError('The input delta time (dt) has a value of {0}.'
-                             'This is beyond the range of DT for which we '
-                             'can reliably propagate states. The limits for '
-                             'this GM and initial state are from {1} '
-                             'to {2}.'.format(dt, kepler(-bound), kepler(bound)))
-        kfun[future] = kepler_1d(x[future], orb_ind)
-
-    x = copy(upper)
-    copyto(x, (upper+lower)/2, where=(lower<=upper))
-
-    lcount = zeros_like(dt)
-    mostc = full_like(dt, 1000)
-    not_done = (lower < x) & (x < upper)
-
-    while not_done.any():
-        orb_inds = sum(not_done, axis=1)
-        kfun[not_done] = kepler_1d(x[not_done], orb_inds)
-
-        high = (kfun > dt) & not_done
-        low = (kfun < dt) & not_done
-        same = (~high & ~low) & not_done
-
-        copyto(upper, x, where=(high|same))
-        copyto(lower, x, where=(low|same))
-
-        condition = not_done & (mostc > 64) & (upper != 0) & (lower != 0)
-        mostc[condition] = 64
-        lcount[condition] = 0
-
-        copyto(x, upper, where=(not_done & (lower>upper)))
-        copyto(x, (upper+lower)/2, where=(not_done & (lower<=upper)))
+    # each of these arrays has 1 entry per orbit, so its shape is (#orbits, 1)
+    f = f[:, newaxis]
+    bq = bq[:, newaxis]
+    b2rv = b2rv[:, newaxis]
+    br0 = br0[:, newaxis]
+    qovr0 = qovr0[:, newaxis]
 
-        lcount += 1
-        not_done = (lower < x) & (x < upper) & (lcount < mostc)
+    # shape of 2 dimensional arrays from here on out is (#orbits, len(t1))
+    dt = dt.reshape(shape)
+    x = x.reshape(shape)
 
     c0, c1, c2, c3 = stumpff(f*x*x)
     br = br0*c0 + x*(b2rv*c1 + x*bq*c2)
@@ -618,4 +663,71 @@ def propagate(position, velocity, t0, t1, gm):
     position_prop = pc[newaxis, :, :]*position[:, :, newaxis] + vc[newaxis, :, :]*velocity[:, :, newaxis]
     velocity_prop = pcdot[newaxis, :, :]*position[:, :, newaxis] + vcdot[newaxis, :, :]*velocity[:, :, newaxis]
 
+    if return_iterations:
+        return (squeeze(position_prop), squeeze(velocity_prop),
+                squeeze(iterations.reshape(shape)))
+    return squeeze(position_prop), squeeze(velocity_prop)
+
+# Roughly how many bytes `propagate()` needs for each orbit and time, as
+# it builds about 30 intermediate arrays of shape (#orbits, #times).
+_BYTES_PER_ELEMENT = 30 * 8
+
+def propagate_in_tiles(position, velocity, t0, t1, gm,
+                       memory_bytes=256 * 1024 * 1024, executor=None):
+    """Run `propagate()` over tiles of orbits and times.
+
+    Takes the same arguments as `propagate()`, and returns the same
+    result, but splits the work into tiles of orbits and times that are
+    each small enough for `propagate()` to finish within roughly
+    ``memory_bytes`` of scratch space, so that millions of orbits can be
+    propagated without memory growing past the size of the result.
+    Tiles are computed one after another, unless a ``concurrent.futures``
+    ``executor`` is supplied, in which case they are submitted to it.
+
+    """
+    if position.ndim == 1:
+        position = position[:, newaxis]
+    if velocity.ndim == 1:
+        velocity = velocity[:, newaxis]
+    orbit_count = position.shape[1]
+    t0 = atleast_1d(t0)
+    if len(t0) == 1:
+        t0 = repeat(t0, orbit_count)
+    t1 = atleast_1d(t1)
+    gm = atleast_1d(gm)
+    time_count = len(t1)
+
+    elements = max(1, memory_bytes // _BYTES_PER_ELEMENT)
+    times_per_tile = min(time_count, elements)
+    orbits_per_tile = max(1, elements // times_per_tile)
+
+    tiles = []
+    for i in range(0, orbit_count, orbits_per_tile):
+        orbits = slice(i, i + orbits_per_tile)
+        tile_gm = gm if len(gm) == 1 else gm[orbits]
+        for j in range(0, time_count, times_per_tile):
+            times = slice(j, j + times_per_tile)
+            args = (position[:,orbits], velocity[:,orbits], t0[orbits],
+                    t1[times], tile_gm)
+            tiles.append((orbits, times, args))
+
+    if len(tiles) == 1:
+        return propagate(*tiles[0][2])
+
+    shape = (3, orbit_count, time_count)
+    position_prop = empty(shape)
+    velocity_prop = empty(shape)
+
+    if executor is None:
+        results = (propagate(*args) for orbits, times, args in tiles)
+    else:
+        futures = [executor.submit(propagate, *args)
+                   for orbits, times, args in tiles]
+        results = (future.result() for future in futures)
+
+    for (orbits, times, args), (p, v) in zip(tiles, results):
+        tile_shape = (3, args[0].shape[1], len(args[3]))
+        position_prop[:,orbits,times] = p.reshape(tile_shape)
+        velocity_prop[:,orbits,times] = v.reshape(tile_shape)
+
     return squeeze(position_prop), squeeze(velocity_prop)
@@ -22,16 +22,17 @@ Ap_Mag_Input_V3.txt
 * ``ph_ang`` illumination phase angle (degrees)
 
 """
-from numpy import array, clip, exp, log10, nan, sin, where
+from numpy import (
+    array, array_equal, arctan2, clip, empty, exp, log10, nan, sin, stack,
+    where,
+)
 from .constants import RAD2DEG
 from .functions import angle_between, length_of
 from .naifcodes import _target_name
 
 # See "design/planet_tilts.py" in the Skyfield repository.
 _SATURN_POLE = array([0.08547883, 0.07323576, 0.99364475])
-_SATURN_POLE_2D = _SATURN_POLE[:, None]
 _URANUS_POLE = array([-0.21199958, -0.94155916, -0.26176809])
-_URANUS_POLE_2D = _URANUS_POLE[:, None]
 
 def planetary_magnitude(position):
     """Given the position of a planet, return its visual magnitude.
@@ -66,40 +67,90 @@ def planetary_magnitude(position):
       observer, which can introduce an error of ±0.06 magnitude.
 
     """
-    target = position.target
-    function = _FUNCTIONS.get(target)
-    if function is None:
-        name = _target_name(target)
-        raise ValueError('cannot compute the magnitude of target %s' % name)
+    function = _function_for(position.target)
 
     # Shamelessly treat the Sun as sitting at the Solar System Barycenter.
     sun_to_observer = position.center_barycentric.xyz.au
     observer_to_planet = position.xyz.au
     sun_to_planet = sun_to_observer + observer_to_planet
+    r, delta, ph_ang = _geometry(sun_to_planet, observer_to_planet)
+    return _evaluate(function, sun_to_planet, observer_to_planet,
+                     position.t.J, r, delta, ph_ang)
 
-    r = length_of(sun_to_planet)
-    delta = length_of(observer_to_planet)
-    ph_ang = angle_between(sun_to_planet, observer_to_planet) * RAD2DEG
+def planetary_magnitudes(positions):
+    """Given the positions of several planets, return their magnitudes.
 
-    if function is _saturn_magnitude:
-        if len(sun_to_planet.shape) > 1:
-            pole = _SATURN_POLE_2D
-        else:
-            pole = _SATURN_POLE
+    This is an alternative to calling `planetary_magnitude()` once for
+    each planet.  All of the ``positions`` must have been observed from
+    the same observer at the same time or times — for example, the list
+    ``[e.observe(eph[name]) for name in names]`` where ``e`` is a single
+    ``earth.at(t)`` position.  The Sun-to-observer vector is then shared,
+    the distances and phase angles of every planet are computed together
+    in a single array operation, and each planet’s formula is evaluated
+    just once for all of the positions that need it.
 
-        a = angle_between(pole, sun_to_planet)
-        sun_sub_lat = a * RAD2DEG - 90.0
+    Returns an array with one row of magnitudes for each position, or
+    simply one magnitude per position if ``t`` was a single time.
 
-        a = angle_between(pole, observer_to_planet)
-        observer_sub_lat = a * RAD2DEG - 90.0
+    """
+    if not positions:
+        raise ValueError('please provide at least one position')
+    functions = [_function_for(position.target) for position in positions]
+
+    first = positions[0]
+    observer = first.center_barycentric
+    sun_to_observer = observer.xyz.au
+    for position in positions[1:]:
+        other = position.center_barycentric
+        if other is not observer and not array_equal(other.xyz.au,
+                                                     sun_to_observer):
+            raise ValueError('all positions must be observed from the same'
+                             ' observer position at the same times')
+
+    # Planets are stacked along a new axis just after x, y, and z, so
+    # that vector routines like length_of() work unchanged.
+    observer_to_planet = stack([p.xyz.au for p in positions], axis=1)
+    sun_to_planet = sun_to_observer[:, None] + observer_to_planet
+    year = first.t.J
+
+    r, delta, ph_ang = _geometry(sun_to_planet, observer_to_planet)
+
+    magnitudes = empty(r.shape)
+    for function in sorted(set(functions), key=functions.index):
+        rows = [i for i, f in enumerate(functions) if f is function]
+        if rows[-1] - rows[0] == len(rows) - 1:
+            rows = slice(rows[0], rows[-1] + 1)  # a view, instead of a copy
+        magnitudes[rows] = _evaluate(
+            function, sun_to_planet[:, rows], observer_to_planet[:, rows],
+            year, r[rows], delta[rows], ph_ang[rows],
+        )
+    return magnitudes
+
+def _function_for(target):
+    function = _FUNCTIONS.get(target)
+    if function is None:
+        name = _target_name(target)
+        raise ValueError('cannot compute the magnitude of target %s' % name)
+    return function
 
-        return function(r, delta, ph_ang, sun_sub_lat, observer_sub_lat)
+def _geometry(sun_to_planet, observer_to_planet):
+    """Return a planet's distances from Sun and observer, and phase angle."""
+    r = length_of(sun_to_planet)
+    delta = length_of(observer_to_planet)
+
+    # Same formula as angle_between(), but reusing the lengths we have.
+    a = sun_to_planet * delta
+    b = observer_to_planet * r
+    ph_ang = 2.0 * arctan2(length_of(a - b), length_of(a + b)) * RAD2DEG
 
-    if function is _uranus_magnitude:
-        if len(sun_to_planet.shape) > 1:
-            pole = _URANUS_POLE_2D
-        else:
-            pole = _URANUS_POLE
+    return r, delta, ph_ang
+
+def _evaluate(function, sun_to_planet, observer_to_planet, year,
+              r, delta, ph_ang):
+    """Evaluate a planet's magnitude formula given its geometry."""
+    if function is _saturn_magnitude or function is _uranus_magnitude:
+        pole = _SATURN_POLE if function is _saturn_magnitude else _URANUS_POLE
+        pole = pole.reshape((3,) + (1,) * (sun_to_planet.ndim - 1))
 
         a = angle_between(pole, sun_to_planet)
         sun_sub_lat = a * RAD2DEG - 90.0
@@ -110,7 +161,6 @@ def planetary_magnitude(position):
         return function(r, delta, ph_ang, sun_sub_lat, observer_sub_lat)
 
     if function is _neptune_magnitude:
-        year = position.t.J
         return function(r, delta, ph_ang, year)
 
     return function(r, delta, ph_ang)
@@ -280,7 +330,7 @@ def _neptune_magnitude(r, delta, ph_ang, year):
 
     # Equation 16 compute the magnitude at unit distance as a function of time
     ap_mag = clip(-6.89 - 0.0054 * (year - 1980.0), -7.00, -6.89)
-    ap_mag += distance_mag_factor
+    ap_mag = ap_mag + distance_mag_factor
 
     geocentric_phase_angle_limit = 1.9
 
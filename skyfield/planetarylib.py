@@ -1,11 +1,14 @@
 # -*- coding: utf-8 -*-
 """Open a BPC file, read its angles, and produce rotation matrices."""
 
-from numpy import array, cos, nan, sin
+from numpy import array, array_equal, cos, nan, sin
 from jplephem.pck import DAF, PCK
 from .constants import ASEC2RAD, AU_KM, DAY_S, tau
+from .descriptorlib import reify
 from .data import text_pck
-from .functions import _T, mxv, mxm, mxmxm, rot_x, rot_y, rot_z
+from .functions import (
+    _T, _sites_mxm, _sites_mxv, mxv, mxm, rot_x, rot_y, rot_z,
+)
 from .units import Angle, Distance
 from .vectorlib import VectorFunction
 
@@ -157,20 +160,24 @@ manually provide a value by adding the name and value to the this
 object's `.variables` dictionary."""
 
 class Frame(object):
-    """Planetary constants frame, for building rotation matrices."""
+    """Planetary constants frame, for building rotation matrices.
 
+    A frame remembers the matrices it computed for the most recent
+    dates it was given, so that many locations on the same body, all
+    observed at the same times, share a single evaluation of the binary
+    PCK segment.
+
+    """
     def __init__(self, center, segment, matrix):
         self.center = center
         self._segment = segment
         self._matrix = matrix
+        self._rotation_cache = None, None
+        self._rotation_and_rate_cache = None, None
 
     def rotation_at(self, t):
         """Return the rotation matrix for this frame at time ``t``."""
-        ra, dec, w = self._segment.compute(t.tdb, 0.0, False)
-        R = mxm(rot_z(-w), mxm(rot_x(-dec), rot_z(-ra)))
-        if self._matrix is not None:
-            R = mxm(self._matrix, R)
-        return R
+        return self._rotation_at(t).copy()
 
     def rotation_and_rate_at(self, t):
         """Return rotation and rate matrices for this frame at time ``t``.
@@ -178,6 +185,34 @@ class Frame(object):
         The rate matrix returned is in units of angular motion per day.
 
         """
+        R, dRdt = self._rotation_and_rate_at(t)
+        return R.copy(), dRdt.copy()
+
+    # The cached versions of the above methods, for internal callers
+    # that promise not to modify the matrices they receive.
+
+    def _rotation_at(self, t):
+        key = t.whole, t.tdb_fraction
+        cached_key, R = self._rotation_cache
+        if _same_dates(key, cached_key):
+            return R
+        ra, dec, w = self._segment.compute(t.tdb, 0.0, False)
+        R = mxm(rot_z(-w), mxm(rot_x(-dec), rot_z(-ra)))
+        if self._matrix is not None:
+            R = mxm(self._matrix, R)
+        self._rotation_cache = _copy_dates(key), R
+        return R
+
+    def _rotation_and_rate_at(self, t):
+        key = t.whole, t.tdb_fraction
+        cached_key, matrices = self._rotation_and_rate_cache
+        if _same_dates(key, cached_key):
+            return matrices
+        matrices = self._compute_rotation_and_rate(t)
+        self._rotation_and_rate_cache = _copy_dates(key), matrices
+        return matrices
+
+    def _compute_rotation_and_rate(self, t):
         components, rates = self._segment.compute(t.whole, t.tdb_fraction, True)
         ra, dec, w = components
         radot, decdot, wdot = rates
@@ -212,7 +247,10 @@ class PlanetTopos(VectorFunction):
     """Location that rotates with the surface of another Solar System body.
 
     The location can either be on the surface of the body, or in some
-    other fixed position that rotates with the body's surface.
+    other fixed position that rotates with the body's surface.  If built
+    from arrays of latitudes and longitudes, a single `PlanetTopos`
+    represents a whole array of locations, whose positions will have an
+    extra dimension, ahead of any dimension for time, for the locations.
 
     """
     def __init__(self, frame, position_au):
@@ -222,8 +260,11 @@ class PlanetTopos(VectorFunction):
 
     @classmethod
     def from_latlon_distance(cls, frame, latitude, longitude, distance):
-        r = array((distance.au, 0.0, 0.0))
-        r = mxv(rot_z(longitude.radians), mxv(rot_y(-latitude.radians), r))
+        lat = latitude.radians
+        lon = longitude.radians
+        r = distance.au * array((cos(lat) * cos(lon),
+                                 cos(lat) * sin(lon),
+                                 sin(lat)))
 
         self = cls(frame, r)
         self.latitude = latitude
@@ -241,25 +282,34 @@ class PlanetTopos(VectorFunction):
     def _at(self, t):
         # Since `_position_au` has zero velocity in this reference
         # frame, velocity includes a `dRdt` term but not an `R` term.
-        R, dRdt = self._frame.rotation_and_rate_at(t)
-        r = mxv(_T(R), self._position_au)
-        v = mxv(_T(dRdt), self._position_au)
-        return r, v, None, None
+        R, dRdt = self._frame._rotation_and_rate_at(t)
+        r = self._position_au
+        rotate = _sites_mxv if r.ndim > 1 else mxv
+        return rotate(_T(R), r), rotate(_T(dRdt), r), None, None
+
+    @reify
+    def _R_latlon(self):
+        # TODO: Figure out how to produce this rotation directly from
+        # _position_au, to support situations where we were not given a
+        # latitude and longitude.
+        return mxm(rot_y(_quartertau - self.latitude.radians),
+                   rot_z(_halftau - self.longitude.radians))
 
     def rotation_at(self, t):
         """Compute the altazimuth rotation matrix for this location’s sky."""
-        R = mxmxm(
-            # TODO: Figure out how to produce this rotation directly
-            # from _position_au, to support situations where we were not
-            # given a latitude and longitude.  If that is not feasible,
-            # then at least cache the product of these first two matrices.
-            rot_y(_quartertau - self.latitude.radians),
-            rot_z(_halftau - self.longitude.radians),
-            self._frame.rotation_at(t),
-        )
+        A = self._R_latlon
+        R = self._frame._rotation_at(t)
+        R = _sites_mxm(A, R) if A.ndim > 2 else mxm(A, R)
         # TODO:
         # Can clockwise be turned into counterclockwise through any
         # possible rotation?  For now, flip the sign of y so that
         # azimuth reads north-east rather than the other direction.
         R[1] *= -1
         return R
+
+def _copy_dates(key):
+    return tuple(array(value, copy=True) for value in key)
+
+def _same_dates(key, cached_key):
+    return cached_key is not None and all(
+        array_equal(a, b) for a, b in zip(key, cached_key))
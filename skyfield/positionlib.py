@@ -7,8 +7,8 @@ from .constants import ANGVEL, AU_M, C, ERAD, DAY_S, RAD2DEG, pi, tau
 from .descriptorlib import reify
 from .earthlib import compute_limb_angle
 from .functions import (
-    _T, _to_array, _to_spherical_and_rates, angle_between, from_spherical,
-    length_of, mxm, mxv, rot_z, to_spherical,
+    _T, _broadcast_sites, _to_array, _to_spherical_and_rates, angle_between,
+    from_spherical, length_of, mxm, mxv, rot_z, to_spherical,
 )
 from .geometry import intersect_line_and_sphere
 from .relativity import add_aberration, add_deflection
@@ -305,7 +305,11 @@ class ICRF(object):
         lon = getattr(self.center, 'longitude', None)
         if lon is None:
             raise ValueError(_hadec_message)
-        ha = lon.radians - sublongtiude
+        lon = lon.radians
+        extra = getattr(sublongtiude, 'ndim', 0) - getattr(lon, 'ndim', 0)
+        if extra > 0 and getattr(lon, 'ndim', 0):
+            lon = lon.reshape(lon.shape + (1,) * extra)  # sites, then times
+        ha = lon - sublongtiude
         ha += pi
         ha %= tau
         ha -= pi
@@ -590,6 +594,7 @@ class ICRF(object):
             earth_m = - self.position.m - gcrs_position * AU_M
 
         sun_m = (ephemeris['sun'] - ephemeris['earth']).at(self.t).position.m
+        sun_m, earth_m = _broadcast_sites(sun_m, earth_m)
         near, far = intersect_line_and_sphere(sun_m + earth_m, earth_m, ERAD)
         return nan_to_num(far) <= 0
 
@@ -1,7 +1,9 @@
 from numpy import abs, einsum, sqrt, where
 
 from .constants import C, AU_M, C_AUDAY, GS
-from .functions import _AVOID_DIVIDE_BY_ZERO, dots, length_of
+from .functions import (
+    _AVOID_DIVIDE_BY_ZERO, _broadcast_sites, dots, length_of,
+)
 
 deflectors = ['sun', 'jupiter', 'saturn', 'moon', 'venus', 'uranus', 'neptune']
 rmasses = {
@@ -50,6 +52,7 @@ def add_deflection(position, observer, ephemeris, t,
         # Get position of gravitating body wrt ss barycenter at time 't_tdb'.
 
         bposition = deflector.at(ts.tdb(jd=jd_tdb)).position.au  # TODO
+        bposition, observer = _broadcast_sites(bposition, observer)
 
         # Get position of gravitating body wrt observer at time 'jd_tdb'.
 
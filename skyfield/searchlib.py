@@ -1,21 +1,127 @@
+# -*- coding: utf-8 -*-
 """Routines to search for maxima and zero crossings."""
 
 from __future__ import print_function, division
 
-from numpy import (add, append, argsort, bool_, concatenate, diff, flatnonzero,
-                   int8, issubdtype, linspace, multiply, reshape, sign)
+import os
+from contextlib import contextmanager
+from multiprocessing import cpu_count
+from timeit import default_timer
+from numpy import (abs, add, append, arange, argsort, array, bool_,
+                   concatenate, diff, empty, errstate, flatnonzero, int8,
+                   issubdtype, linspace, load, maximum, multiply, nan, reshape,
+                   savez, searchsorted, sign, size, where)
 from .constants import DAY_S
 EPSILON = 0.001 / DAY_S
 
-_trace = None  # User can replace with a routine to save search iterations.
+_recorders = []
 
-def find_discrete(start_time, end_time, f, epsilon=EPSILON, num=12):
+class SearchRecord(object):
+    """Statistics about one search, gathered by `record_searches()`.
+
+    ``routine`` — The name of the search routine, like ``'find_discrete'``.
+
+    ``function`` — The name of the function that was searched.
+
+    ``step_days`` — The function’s ``step_days``, if it has one.
+
+    ``calls`` — How many times the function was called.
+
+    ``samples`` — How many times the function was evaluated at, in total,
+    across all of its calls.
+
+    ``rounds`` — How many rounds of refinement the search performed.
+
+    ``seconds`` — How long the search took.
+
+    """
+    def __init__(self, routine, function, step_days=None):
+        self.routine = routine
+        self.function = function
+        self.step_days = step_days
+        self.calls = 0
+        self.samples = 0
+        self.rounds = 0
+        self.seconds = 0.0
+
+    def __repr__(self):
+        return ('<SearchRecord {0} of {1}: {2} calls, {3} samples,'
+                ' {4} rounds, {5:.3f} seconds>'.format(
+                    self.routine, self.function, self.calls, self.samples,
+                    self.rounds, self.seconds))
+
+@contextmanager
+def record_searches():
+    """Record statistics about every search run inside a ``with`` block.
+
+    Yields a list to which a :class:`SearchRecord` is appended as each
+    search finishes, whether the search was called directly or from a
+    routine like those in :mod:`skyfield.almanac`.  Calls made to the
+    function by a process pool, in other processes, are not counted.
+
+    """
+    records = []
+    _recorders.append(records)
+    try:
+        yield records
+    finally:
+        _recorders.remove(records)
+
+def _start_record(routine, f, name=None):
+    """Return a `SearchRecord`, or None if no one is recording searches.
+
+    Functions passed to the search can then be wrapped with `_counted()`.
+
+    """
+    if not _recorders:
+        return None
+    if name is None:
+        name = getattr(f, '__name__', repr(f))
+    record = SearchRecord(routine, name, getattr(f, 'step_days', None))
+    record._start = default_timer()
+    return record
+
+def _counted(f, record):
+    """Return `f`, wrapped to count its calls if `record` is not None."""
+    if record is None or f is None:
+        return f
+    return _Counter(f, record)
+
+class _Counter(object):
+    def __init__(self, f, record):
+        self.f = f
+        self.record = record
+
+    def __call__(self, t):
+        self.record.calls += 1
+        self.record.samples += size(t.tt)
+        return self.f(t)
+
+def _finish_record(record, rounds):
+    if record is None:
+        return
+    record.rounds = rounds
+    record.seconds = default_timer() - record._start
+    del record._start
+    for records in _recorders:
+        records.append(record)
+
+def find_discrete(start_time, end_time, f, epsilon=EPSILON, num=12,
+                  executor=None, partitions=None):
     """Find the times at which a discrete function of time changes value.
 
     This routine is used to find instantaneous events like sunrise,
     transits, and the seasons.  See :doc:`searches` for how to use it
     yourself.
 
+    A long search can be spread across several threads or processes by
+    passing a ``concurrent.futures`` ``executor``.  The search's initial
+    grid of samples is then split into ``partitions`` runs of adjacent
+    samples (by default, one per CPU) that are refined independently,
+    and the result is identical to that of a serial search.  For a
+    process pool, ``f`` must be picklable, like a module-level function
+    that loads its own ephemeris the first time it runs in each worker.
+
     """
     ts = start_time.ts
     jd0 = start_time.tt
@@ -41,26 +147,90 @@ def find_discrete(start_time, end_time, f, epsilon=EPSILON, num=12):
         sample_count = int((jd1 - jd0) / step_days) + 2
 
     jd = linspace(jd0, jd1, sample_count)
-    return _find_discrete(ts, jd, f, epsilon, num)
+    record = _start_record('find_discrete', f)
+    f = _counted(f, record)
+    if executor is None:
+        ends, y, rounds = _find_transitions(ts, jd, f, epsilon, num)
+    else:
+        ends, y, rounds = _find_transitions_in_parallel(
+            ts, jd, f, epsilon, num, executor, partitions)
+    _finish_record(record, rounds)
+    return _finish_discrete(ts, ends, y, epsilon)
+
+def _find_discrete(ts, jd, f, epsilon, num, y=None):
+    """Algorithm core, for callers that already have a `jd` vector.
 
-# TODO: pass in `y` so it can be precomputed?
+    A caller who has already computed ``y = f(t)`` for the times `jd`
+    can pass it in, to save the search from computing it again.
 
-def _find_discrete(ts, jd, f, epsilon, num):
-    """Algorithm core, for callers that already have a `jd` vector."""
+    """
+    record = _start_record('find_discrete', f)
+    ends, y, rounds = _find_transitions(ts, jd, _counted(f, record),
+                                        epsilon, num, y)
+    _finish_record(record, rounds)
+    return _finish_discrete(ts, ends, y, epsilon)
+
+def _find_transitions_in_parallel(ts, jd, f, epsilon, num, executor,
+                                  partitions):
+    """Run `_find_transitions()` on independent runs of the `jd` grid.
+
+    Adjacent partitions share the sample at their boundary, so each
+    bracket of the original grid belongs to exactly one partition, and
+    is refined exactly as a serial search would refine it.  The only
+    coupling in a serial search is that its number of refinement rounds
+    is decided by its first bracket; so any partition that ran for a
+    different number of rounds than the partition holding that bracket
+    is run again with the serial count imposed.
+
+    """
+    if partitions is None:
+        partitions = cpu_count()
+    partitions = max(1, min(partitions, len(jd) - 1))
+    edges = linspace(0, len(jd) - 1, partitions + 1).astype(int)
+    pieces = [jd[i:j+1] for i, j in zip(edges[:-1], edges[1:])]
+
+    futures = [executor.submit(_find_transitions, ts, piece, f, epsilon, num)
+               for piece in pieces]
+    results = [future.result() for future in futures]
+
+    rounds = [r for ends, y, r in results if len(ends)]
+    if not rounds:
+        rounds = 0
+    else:
+        rounds = rounds[0]
+        futures = {}
+        for i, (ends, y, r) in enumerate(results):
+            if len(ends) and r != rounds:
+                futures[i] = executor.submit(_find_transitions, ts,
+                                             pieces[i], f, epsilon, num,
+                                             None, rounds)
+        for i in sorted(futures):
+            results[i] = futures[i].result()
+
+    ends = concatenate([ends for ends, y, r in results])
+    y = concatenate([y for ends, y, r in results])
+    return ends, y, rounds
+
+def _find_transitions(ts, jd, f, epsilon, num, y=None, rounds=None):
+    """Refine every change in `f` across the grid `jd` down to `epsilon`.
+
+    Returns the time that ends each bracket, the new value of `f` at
+    that time, and the number of refinement rounds that were needed; a
+    caller can instead impose a particular number of `rounds`.
+
+    """
     end_mask = linspace(0.0, 1.0, num)
     start_mask = end_mask[::-1]
-    o = multiply.outer
 
-    while True:
-        t = ts.tt_jd(jd)
-        y = f(t)
+    if y is None:
+        y = f(ts.tt_jd(jd))
 
+    n = 0
+    while True:
         indices = flatnonzero(diff(y))
         if not len(indices):
             # Nothing found, so immediately return empty arrays.
-            ends = jd.take(indices)
-            y = y.take(indices)
-            break
+            return jd.take(indices), y.take(indices), n
 
         starts = jd.take(indices)
         ends = jd.take(indices + 1)
@@ -68,39 +238,399 @@ def _find_discrete(ts, jd, f, epsilon, num):
         # Since we start with equal intervals, they all should fall
         # below epsilon at around the same time; so for efficiency we
         # only test the first pair.
-        if ends[0] - starts[0] <= epsilon:
-            y = y.take(indices + 1)
-            # Keep only the last of several zero crossings that might
-            # possibly be separated by less than epsilon.
-            mask = concatenate(((diff(ends) > 3.0 * epsilon), (True,)))
-            ends = ends[mask]
-            y = y[mask]
-            break
+        if rounds is None:
+            if ends[0] - starts[0] <= epsilon:
+                return ends, y.take(indices + 1), n
+        elif n == rounds:
+            return ends, y.take(indices + 1), n
+
+        jd, y = _subdivide(ts, f, starts, ends, y.take(indices),
+                           y.take(indices + 1), start_mask, end_mask)
+        n += 1
+
+def _finish_discrete(ts, ends, y, epsilon):
+    if len(ends):
+        # Keep only the last of several zero crossings that might
+        # possibly be separated by less than epsilon.
+        mask = concatenate(((diff(ends) > 3.0 * epsilon), (True,)))
+        ends = ends[mask]
+        y = y[mask]
+    return ts.tt_jd(ends), _fix_numpy_deprecation(y)
 
-        jd = o(starts, start_mask).flatten() + o(ends, end_mask).flatten()
+class EventTable(object):
+    """A precomputed table of the times at which a discrete function changes.
 
-    return ts.tt_jd(ends), _fix_numpy_deprecation(y)
+    Events like the phases of the Moon, the seasons, or the solar terms
+    are the same for everyone on Earth, so there is no need to search
+    for them over and over again.  Build a table once, with `build()`,
+    for the range of dates you expect to need, and its `find()` method
+    can then answer with the same arrays as :func:`find_discrete()`
+    using only a binary search.  Dates outside the table fall back to a
+    live search with ``f``.
 
-def find_minima(start_time, end_time, f, epsilon=1.0 / DAY_S, num=12):
+    Each table also records a ``key`` naming the function ``f`` and the
+    ephemeris files it reads, so that `cached_event_table()` can tell
+    whether a saved table was built for the same events.
+
+    """
+    def __init__(self, f, ts, tt, y, tt_start, tt_end, key=None):
+        self.f = f
+        self.ts = ts
+        self.tt = tt
+        self.y = y
+        self.tt_start = tt_start
+        self.tt_end = tt_end
+        self.key = key
+
+    @classmethod
+    def build(cls, f, start_time, end_time, epsilon=EPSILON, num=12):
+        """Search for every event between two times, and return a table."""
+        t, y = find_discrete(start_time, end_time, f, epsilon, num)
+        return cls(f, start_time.ts, t.tt, y, start_time.tt, end_time.tt,
+                   _event_table_key(f))
+
+    @classmethod
+    def load(cls, path, f, ts):
+        """Load a table that was written by `save()`."""
+        with load(path) as arrays:
+            tt_start, tt_end = arrays['span']
+            key = str(arrays['key']) if 'key' in arrays.files else None
+            return cls(f, ts, arrays['tt'], arrays['y'], tt_start, tt_end,
+                       key)
+
+    def save(self, path):
+        """Save this table as a NumPy ``.npz`` file."""
+        tmp = '{0}.tmp{1}.npz'.format(path, os.getpid())
+        savez(tmp, tt=self.tt, y=self.y,
+              span=array([self.tt_start, self.tt_end]),
+              key=array(self.key or ''))
+        if os.path.exists(path):
+            os.remove(path)
+        os.rename(tmp, path)
+
+    def covers(self, start_time, end_time):
+        """Return whether this table spans the two times given."""
+        return self.tt_start <= start_time.tt and end_time.tt <= self.tt_end
+
+    def find(self, start_time, end_time):
+        """Return the events between two times, like `find_discrete()`."""
+        tt0 = start_time.tt
+        tt1 = end_time.tt
+        if tt0 >= tt1:
+            raise ValueError('your start_time {0} is later than your'
+                             ' end_time {1}'.format(start_time, end_time))
+
+        tt = self.tt
+        i = searchsorted(tt, tt0)
+        j = searchsorted(tt, tt1, 'right')
+        tts = [tt[i:j]]
+        ys = [self.y[i:j]]
+
+        ts = self.ts
+        if tt0 < self.tt_start:
+            t, y = find_discrete(start_time, ts.tt_jd(min(tt1, self.tt_start)),
+                                 self.f)
+            keep = t.tt < self.tt_start
+            tts.insert(0, t.tt[keep])
+            ys.insert(0, y[keep])
+        if tt1 > self.tt_end:
+            t, y = find_discrete(ts.tt_jd(max(tt0, self.tt_end)), end_time,
+                                 self.f)
+            keep = t.tt > self.tt_end
+            tts.append(t.tt[keep])
+            ys.append(y[keep])
+
+        return ts.tt_jd(concatenate(tts)), concatenate(ys)
+
+def cached_event_table(path, f, start_time, end_time):
+    """Return an `EventTable` for ``f``, building and saving it if needed.
+
+    If the file at ``path`` already holds a table that spans the two
+    times given, and that was built by a function of the same name
+    reading the same ephemeris files as ``f``, it is simply loaded.
+    Otherwise the events are found with :func:`find_discrete()` and
+    saved to ``path`` for next time, replacing the old table.
+
+    """
+    ts = start_time.ts
+    if os.path.exists(path):
+        table = EventTable.load(path, f, ts)
+        if (table.key == _event_table_key(f)
+            and table.covers(start_time, end_time)):
+            return table
+    table = EventTable.build(f, start_time, end_time)
+    table.save(path)
+    return table
+
+def _event_table_key(f):
+    """Return a string naming `f` and the ephemeris files it reads.
+
+    Functions like :func:`~skyfield.almanac.moon_phases()` return a
+    closure over bodies from an ephemeris, so each body in the closure
+    is asked for the file its segments were loaded from.
+
+    """
+    filenames = set()
+    for cell in getattr(f, '__closure__', None) or ():
+        try:
+            value = cell.cell_contents
+        except ValueError:  # a cell not yet assigned a value
+            continue
+        for segment in getattr(value, 'vector_functions', (value,)):
+            ephemeris = getattr(segment, 'ephemeris', None)
+            filename = getattr(ephemeris, 'filename', None)
+            if filename is not None:
+                filenames.add(filename)
+    name = '{0}.{1}'.format(getattr(f, '__module__', None),
+                            getattr(f, '__name__', type(f).__name__))
+    return ' '.join([name] + sorted(filenames))
+
+def _subdivide(ts, f, starts, ends, y_starts, y_ends, start_mask, end_mask):
+    """Split each bracket into `num` points, calling `f` only on new ones.
+
+    The values of `f` at each bracket's endpoints are already known, so
+    `f` is only called for the points in between; the endpoints that
+    come out of the interpolation are exactly `starts` and `ends`.
+
+    """
+    o = multiply.outer
+    inner = o(starts, start_mask[1:-1]) + o(ends, end_mask[1:-1])
+    y_inner = f(ts.tt_jd(inner.flatten()))
+
+    n, num = len(starts), len(end_mask)
+    jd = empty((n, num))
+    jd[:,0] = starts
+    jd[:,1:-1] = inner
+    jd[:,-1] = ends
+
+    y = empty((n, num), y_inner.dtype)
+    y[:,0] = y_starts
+    y[:,1:-1] = y_inner.reshape(n, num - 2)
+    y[:,-1] = y_ends
+    return jd.flatten(), y.flatten()
+
+def find_zeros(start_time, end_time, f, epsilon=EPSILON, rate=None):
+    """Find the times at which a continuous function of time crosses zero.
+
+    Like :func:`find_discrete()`, this needs ``f`` to have a
+    ``step_days`` attribute, and returns the times found plus, for each
+    time, the new value of ``f(t) > 0`` as a ``0`` or ``1``.  But
+    because ``f`` is continuous, each crossing can be homed in on with
+    secant steps, which usually need far fewer calls to ``f`` than the
+    evenly spaced samples of a discrete search.
+
+    If you can cheaply compute the rate at which ``f`` changes, in units
+    per day, either supply a ``rate(t)`` function or have ``f`` itself
+    return a tuple ``(value, rate)``; the search will then take Newton
+    steps instead, which converge faster still.
+
+    If ``f`` also has a ``max_rate`` attribute, giving an upper limit on
+    how fast its value can change in units per day, then samples are no
+    longer evenly spaced: wherever ``f`` is far from zero, the search
+    skips ahead as far as ``f`` could not possibly reach zero, and only
+    takes steps as short as ``step_days`` near a crossing.
+
+    """
+    ts = start_time.ts
+    jd0 = start_time.tt
+    jd1 = end_time.tt
+    if jd0 >= jd1:
+        raise ValueError('your start_time {0} is later than your end_time {1}'
+                         .format(start_time, end_time))
+
+    step_days = getattr(f, 'step_days', None)
+    if step_days is None:
+        raise AttributeError('the function you have passed'
+                             ' is missing a "step_days" attribute')
+
+    max_rate = getattr(f, 'max_rate', None)
+    record = _start_record('find_zeros', f)
+    f = _counted(f, record)
+    rate = _counted(rate, record)
+    if max_rate is None:
+        jd = linspace(jd0, jd1, int((jd1 - jd0) / step_days) + 2)
+        y, r = _value_and_rate(f, rate, ts.tt_jd(jd))
+    else:
+        jd, y, r = _adaptive_samples(ts, f, rate, jd0, jd1, step_days,
+                                     max_rate)
+
+    positive = y > 0.0
+    indices = flatnonzero(diff(positive))
+    i = indices + 1
+    if r is None:
+        d0 = d1 = None
+    else:
+        d0 = r.take(indices)
+        d1 = r.take(i)
+    jd, rounds = _find_zeros(ts, f, rate, jd.take(indices), jd.take(i),
+                             y.take(indices), y.take(i), d0, d1, epsilon)
+    _finish_record(record, rounds)
+    return ts.tt_jd(jd), _fix_numpy_deprecation(positive.take(i))
+
+def _adaptive_samples(ts, f, rate, jd0, jd1, step_days, max_rate,
+                      lane_steps=16):
+    """Sample `f` more sparsely wherever it is too far from zero to cross.
+
+    A function whose value is `y` and whose rate never exceeds
+    `max_rate` cannot reach zero in less than ``abs(y) / max_rate``
+    days, so that is how far ahead each sample is taken, though never
+    less than `step_days`.  To keep `f` vectorized, the range is divided
+    into lanes of about `lane_steps` uniform steps each, and all of the
+    lanes step forward together, with one call to `f` per round.
+
+    """
+    lanes = int((jd1 - jd0) / step_days / lane_steps) + 1
+    edges = linspace(jd0, jd1, lanes + 1)
+    x = edges[:-1]
+    ends = edges[1:]
+
+    jd = [edges]
+    y, r = _value_and_rate(f, rate, ts.tt_jd(edges))
+    ys = [y]
+    rs = [r]
+    y = y[:-1]
+
+    while True:
+        x = x + maximum(abs(y) / max_rate, step_days)
+        keep = x < ends
+        x = x[keep]
+        ends = ends[keep]
+        if not len(x):
+            break
+        y, r = _value_and_rate(f, rate, ts.tt_jd(x))
+        jd.append(x)
+        ys.append(y)
+        rs.append(r)
+
+    jd = concatenate(jd)
+    i = argsort(jd, kind='mergesort')
+    y = concatenate(ys)[i]
+    r = None if rs[0] is None else concatenate(rs)[i]
+    return jd[i], y, r
+
+def _value_and_rate(f, rate, t):
+    """Return `f(t)` and its rate, or None if its rate is not known."""
+    y = f(t)
+    if isinstance(y, tuple):
+        return y
+    return y, None if rate is None else rate(t)
+
+def _find_zeros(ts, f, rate, a, b, ya, yb, da, db, epsilon):
+    """Refine each bracket ``[a, b]`` across which `f` changes sign.
+
+    All the brackets are refined together, with `f` called once per
+    round for the brackets that have not yet converged.  If the rates
+    `da` and `db` are known, then Newton's method is used from whichever
+    endpoint has the smaller value; otherwise, the Illinois variant of
+    the secant method.  Either way, a step that would land outside its
+    bracket becomes a bisection instead, and a bracket is finished once
+    its estimate moves by less than `epsilon` or the bracket itself
+    shrinks below `epsilon`.  Returns the zeros and the number of
+    rounds it took to find them.
+
+    """
+    a = a.copy()
+    b = b.copy()
+    ya = ya.astype(float)
+    yb = yb.astype(float)
+    newton = da is not None
+    x = empty(len(a))
+    x_old = empty(len(a))
+    x_old.fill(nan)
+    side = empty(len(a), int8)
+    side.fill(0)
+    results = empty(len(a))
+    active = arange(len(a))
+    rounds = 0
+
+    while len(active):
+        rounds += 1
+        with errstate(divide='ignore', invalid='ignore'):
+            if newton:
+                near = abs(ya) < abs(yb)
+                x = (where(near, a, b)
+                     - where(near, ya, yb) / where(near, da, db))
+            else:
+                x = a - ya * (b - a) / (yb - ya)
+        outside = ~((x >= a) & (x <= b))
+        x[outside] = ((a + b) / 2.0)[outside]
+
+        y, d = _value_and_rate(f, rate, ts.tt_jd(x))
+
+        done = (abs(x - x_old) <= epsilon) | (y == 0.0) | (b - a <= epsilon)
+        results[active[done]] = x[done]
+
+        # Replace the endpoint whose value has the same sign as `y`.
+        left = (y > 0.0) == (ya > 0.0)
+        right = ~left
+        a = where(left, x, a)
+        b = where(right, x, b)
+        ya = where(left, y, ya)
+        yb = where(right, y, yb)
+        if newton:
+            da = where(left, d, da)
+            db = where(right, d, db)
+        else:
+            # Illinois: if the same endpoint is replaced twice in a row,
+            # halve the value at the other, so the bracket keeps closing
+            # from both sides.
+            ya = where(right & (side == 1), ya / 2.0, ya)
+            yb = where(left & (side == -1), yb / 2.0, yb)
+            side = where(left, -1, 1)
+
+        keep = ~done
+        active = active[keep]
+        a, b, ya, yb, x_old, side = (a[keep], b[keep], ya[keep], yb[keep],
+                                     x[keep], side[keep])
+        if newton:
+            da = da[keep]
+            db = db[keep]
+
+    return results, rounds
+
+def find_minima(start_time, end_time, f, epsilon=1.0 / DAY_S, num=12,
+                rate=None):
     """Find the local minima in the values returned by a function of time.
 
     This routine is used to find events like minimum elongation.  See
     :doc:`searches` for how to use it yourself.
 
     """
+    record = _start_record('find_minima', f)
     def g(t): return -f(t)
     g.rough_period = getattr(f, 'rough_period', None)
     g.step_days = getattr(f, 'step_days', None)
-    t, y = find_maxima(start_time, end_time, g, epsilon, num)
+    if rate is not None:
+        def g_rate(t): return _negate(rate(t))
+    else:
+        g_rate = None
+    t, y = _find_maxima(start_time, end_time, g, epsilon, num, g_rate, record)
     return t, _fix_numpy_deprecation(-y)
 
-def find_maxima(start_time, end_time, f, epsilon=1.0 / DAY_S, num=12):
+def _negate(value):
+    if isinstance(value, tuple):
+        return tuple(-v for v in value)
+    return -value
+
+def find_maxima(start_time, end_time, f, epsilon=1.0 / DAY_S, num=12,
+                rate=None):
     """Find the local maxima in the values returned by a function of time.
 
     This routine is used to find events like highest altitude and
     maximum elongation.  See :doc:`searches` for how to use it yourself.
 
+    If you can supply a ``rate(t)`` function that returns the rate at
+    which ``f`` changes, in units per day, then the search instead finds
+    each maximum as a time at which the rate falls through zero, using
+    the same secant steps as :func:`find_zeros()`, and calls ``f`` only
+    once at the end to learn the value of each maximum.  If ``rate``
+    returns a tuple ``(rate, acceleration)`` then Newton steps are used.
+
     """
+    record = _start_record('find_maxima', f)
+    return _find_maxima(start_time, end_time, f, epsilon, num, rate, record)
+
+def _find_maxima(start_time, end_time, f, epsilon, num, rate, record):
     #    @@       @@_@@       @@_@@_@@_@@
     #   /  \     /     \     /           \
     # @@    @@ @@       @@ @@             @@
@@ -136,18 +666,25 @@ def find_maxima(start_time, end_time, f, epsilon=1.0 / DAY_S, num=12):
         real_step = (jd1 - jd0) / steps
         jd = linspace(jd0 - real_step, jd1 + real_step, steps + 2)
 
+    f = _counted(f, record)
+
+    if rate is not None:
+        jd, y, rounds = _find_maxima_by_rate(ts, jd0, jd1, jd, f,
+                                             _counted(rate, record), epsilon)
+        _finish_record(record, rounds)
+        return ts.tt_jd(jd), _fix_numpy_deprecation(y)
+
     end_alpha = linspace(0.0, 1.0, num)
     start_alpha = end_alpha[::-1]
-    o = multiply.outer
 
-    while True:
-        t = ts.tt_jd(jd)
-        y = f(t)
+    y = f(ts.tt_jd(jd))
+    rounds = 0
 
+    while True:
         # Since we start with equal intervals, they all should fall
         # below epsilon at around the same time; so for efficiency we
         # only test the first pair.
-        if t[1] - t[0] <= epsilon:
+        if jd[1] - jd[0] <= epsilon:
             jd, y = _identify_maxima(jd, y)
 
             # Filter out maxima that fell slightly outside our bounds.
@@ -166,9 +703,6 @@ def find_maxima(start_time, end_time, f, epsilon=1.0 / DAY_S, num=12):
 
         left, right = _choose_brackets(y)
 
-        if _trace is not None:
-            _trace((t, y, left, right))
-
         if not len(left):
             # No maxima found.
             jd = y = y[0:0]
@@ -177,11 +711,47 @@ def find_maxima(start_time, end_time, f, epsilon=1.0 / DAY_S, num=12):
         starts = jd.take(left)
         ends = jd.take(right)
 
-        jd = o(starts, start_alpha).flatten() + o(ends, end_alpha).flatten()
-        jd = _remove_adjacent_duplicates(jd)
+        jd, y = _subdivide(ts, f, starts, ends, y.take(left), y.take(right),
+                           start_alpha, end_alpha)
+        rounds += 1
+
+        # Adjacent brackets share an endpoint, which now appears twice.
+        mask = append(diff(jd) != 0, [True])
+        jd = jd[mask]
+        y = y[mask]
 
+    _finish_record(record, rounds)
     return ts.tt_jd(jd), _fix_numpy_deprecation(y)
 
+def _find_maxima_by_rate(ts, jd0, jd1, jd, f, rate, epsilon):
+    """Find maxima as the times at which `rate` falls through zero.
+
+    Returns the times of the maxima, their values, and how many rounds
+    of refinement were needed.
+
+    """
+    r, d = _value_and_rate(rate, None, ts.tt_jd(jd))
+    indices = flatnonzero((r[:-1] > 0.0) & (r[1:] <= 0.0))
+    i = indices + 1
+    if d is None:
+        d0 = d1 = None
+    else:
+        d0 = d.take(indices)
+        d1 = d.take(i)
+    jd, rounds = _find_zeros(ts, rate, None, jd.take(indices), jd.take(i),
+                             r.take(indices), r.take(i), d0, d1, epsilon)
+
+    # Filter out maxima that fell slightly outside our bounds.
+    jd = jd[(jd >= jd0) & (jd <= jd1)]
+
+    # Keep only the first of several maxima that are separated by less
+    # than epsilon.
+    if not len(jd):
+        return jd, jd, rounds
+    jd = jd[concatenate(((True,), diff(jd) > epsilon))]
+
+    return jd, f(ts.tt_jd(jd)), rounds
+
 def _choose_brackets(y):
     """Return the indices between which we should search for maxima of `y`."""
     dsd = diff(sign(diff(y)))
@@ -1,9 +1,10 @@
+# -*- coding: utf-8 -*-
 """Python class for a distant object with, at most, proper motion."""
 
-from numpy import array, cos, empty, isnan, outer, sin, where
+from numpy import array, arcsin, cos, einsum, empty, isnan, outer, sin, where
 from .constants import AU_KM, ASEC2RAD, C, C_AUDAY, DAY_S, T0
-from .functions import length_of
-from .relativity import light_time_difference
+from .descriptorlib import reify
+from .functions import _AVOID_DIVIDE_BY_ZERO, length_of, to_spherical
 from .timelib import Time
 from .units import Angle
 
@@ -106,10 +107,67 @@ class Star(object):
             epoch=epoch,
         )
 
+    def propagated_to(self, t):
+        """Return a copy of this star with its motion applied through ``t``.
+
+        The position of a `Star` is stored at its catalog ``epoch``.  This
+        method builds a new `Star` whose ``epoch`` is ``t`` instead, and
+        whose right ascension, declination, proper motion, parallax, and
+        radial velocity have all been recomputed for that date from the
+        star’s straight-line space motion.  The new star keeps the
+        position and velocity vectors computed here, plus the unit
+        vectors toward each star, so observations of a large catalog
+        made around ``t`` skip that per-call work.  The new star will
+        return the same positions as the original to within the limits
+        of floating point precision.
+
+        """
+        epoch = t.tt if isinstance(t, Time) else t
+        velocity = self._velocity_au_per_d
+        position = self._position_au + velocity * (epoch - self.epoch)
+        distance, dec, ra = to_spherical(position)
+
+        # Invert the formulae of `_compute_vectors()` for the new date,
+        # leaving a missing parallax missing.
+        cra = cos(ra)
+        sra = sin(ra)
+        cdc = cos(dec)
+        sdc = sin(dec)
+        parallax = arcsin(1.0 / distance) / ASEC2RAD * 1e3
+        radial = (cdc * cra * velocity[0] + cdc * sra * velocity[1]
+                  + sdc * velocity[2])
+        radial_km_per_s = radial / (DAY_S / self.au_km + radial * 1e3 / C)
+        k = 1.0 / (1.0 - radial_km_per_s / C * 1000.0)
+        pmr = - sra * velocity[0] + cra * velocity[1]
+        pmd = (- sdc * cra * velocity[0] - sdc * sra * velocity[1]
+               + cdc * velocity[2])
+
+        # Build the copy without `__init__()`, whose `_compute_vectors()`
+        # would only repeat the work done above.
+        star = Star.__new__(Star)
+        star.ra = Angle(radians=ra, preference='hours')
+        star.dec = Angle(radians=dec, signed=True)
+        star.ra_mas_per_year = pmr * parallax * 365.25 / k
+        star.dec_mas_per_year = pmd * parallax * 365.25 / k
+        star.parallax_mas = where(self.parallax_mas > 0.0, parallax,
+                                  self.parallax_mas)[()]
+        star.radial_km_per_s = radial_km_per_s
+        star.epoch = epoch
+        star.names = self.names
+        star._position_au = position
+        star._velocity_au_per_d = velocity
+        star._unit_vector = position / (distance + _AVOID_DIVIDE_BY_ZERO)
+        return star
+
     def _observe_from_bcrs(self, observer):
         position, velocity = self._position_au, self._velocity_au_per_d
         t = observer.t
-        dt = light_time_difference(position, observer.position.au)
+
+        # The difference in light time between the Solar System
+        # barycenter and the observer, as `light_time_difference()`
+        # computes it, but reusing this star's unit vector.
+        dt = einsum('a...,a...', self._unit_vector,
+                    observer.position.au) / C_AUDAY
         if t.shape:
             position = (outer(velocity, t.tdb + dt - self.epoch).T + position).T
         else:
@@ -132,6 +190,33 @@ class Star(object):
             t = t.ts.tt_jd(tt)
         return vector, vel, t, light_time
 
+    def _observe_each_from_bcrs(self, observer, indexes):
+        """Like `_observe_from_bcrs()`, for one star at each time.
+
+        The star ``indexes[k]`` of this array of stars is observed at
+        the ``k``-th time of the ``observer``, instead of every star
+        being observed at every time.
+
+        """
+        position = self._position_au[:, indexes]
+        velocity = self._velocity_au_per_d[:, indexes]
+        epoch = self.epoch
+        if getattr(epoch, 'shape', None):
+            epoch = epoch[indexes]
+        t = observer.t
+        dt = einsum('a...,a...', self._unit_vector[:, indexes],
+                    observer.position.au) / C_AUDAY
+        position = position + velocity * (t.tdb + dt - epoch)
+        vector = position - observer.position.au
+        vel = observer.velocity.au_per_d - velocity
+        light_time = length_of(vector) / C_AUDAY
+        return vector, vel, t, light_time
+
+    @reify
+    def _unit_vector(self):
+        position = self._position_au
+        return position / (length_of(position) + _AVOID_DIVIDE_BY_ZERO)
+
     def _compute_vectors(self):
         """Compute the star's position as an ICRF position and velocity."""
 
@@ -181,6 +266,7 @@ class Star(object):
               pmr * cra - pmd * sdc * sra + rvl * cdc * sra,
               pmd * cdc + rvl * sdc,
               ))
+        self.__dict__.pop('_unit_vector', None)
 
 def _unwrap(value):
     """Return floats untouched, but ask Series for their NumPy arrays."""
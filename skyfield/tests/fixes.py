@@ -52,3 +52,19 @@ class low_precision_ERA(object):
     def era(self, whole, fraction):
         rounded_single_float = whole + fraction
         return self.saved(rounded_single_float)
+
+class InlineExecutor(object):
+    """Stand in for a `concurrent.futures` executor, running each call now."""
+    def __init__(self):
+        self.calls = 0
+
+    def submit(self, function, *args):
+        self.calls += 1
+        return _Done(function(*args))
+
+class _Done(object):
+    def __init__(self, value):
+        self.value = value
+
+    def result(self):
+        return self.value
@@ -1,5 +1,7 @@
-from numpy import array, concatenate as concat
+from numpy import array, concatenate as concat, isnan
+from assay import assert_raises
 from skyfield import api, almanac
+from skyfield.searchlib import record_searches
 
 # Compare with USNO:
 # http://aa.usno.navy.mil/cgi-bin/aa_moonill2.pl?form=1&year=2018&task=00&tz=-05
@@ -127,3 +129,143 @@ def test_close_start_and_end():
     t, y = almanac.find_discrete(t0, t1, almanac.seasons(e))
     strings = t.utc_strftime('%Y-%m-%d %H:%M')
     assert strings == ['2018-09-23 01:54']
+
+def test_searches_are_recorded():
+    ts = api.load.timescale()
+    t0 = ts.utc(2018, 9, 20)
+    t1 = ts.utc(2018, 9, 23)
+    e = api.load('de421.bsp')
+    observer = e['earth'] + api.wgs84.latlon(36.7138, -112.2169)
+    with record_searches() as records:
+        almanac.find_discrete(t0, t1, almanac.seasons(e))
+        almanac.find_risings(observer, e['sun'], t0, t1)
+    seasons, risings = records
+    assert seasons.routine == 'find_discrete'
+    assert seasons.function == 'season_at'
+    assert seasons.step_days == 90.0
+    assert seasons.calls == seasons.rounds + 1
+    assert risings.routine == 'find_risings'
+    assert risings.function == '10 SUN'
+    assert (risings.calls, risings.rounds) == (4, 3)
+    assert risings.samples == 5 + 3 * 3
+
+def test_risings_settings_and_transits_for_many_sites():
+    ts = api.load.timescale()
+    t0 = ts.utc(2020, 6, 1)
+    t1 = ts.utc(2020, 6, 11)
+    e = api.load('de421.bsp')
+    earth = e['earth']
+    lats = [0.0, 36.7, -33.9, 69.6]
+    lons = [0.0, -112.2, 151.2, 18.9]
+    sites = api.wgs84.latlon(lats, lons)
+    for target in e['sun'], e['moon']:
+        for find in almanac.find_risings, almanac.find_settings:
+            t, y, i = find(earth + sites, target, t0, t1, indexes=True)
+            for site, (lat, lon) in enumerate(zip(lats, lons)):
+                observer = earth + api.wgs84.latlon(lat, lon)
+                t2, y2 = find(observer, target, t0, t1)
+                assert len(t2) == sum(i == site)
+                assert abs(t.tt[i == site] - t2.tt).max() < 2.0 / 86400.0
+                assert list(y[i == site]) == list(y2)
+        t, i = almanac.find_transits(earth + sites, target, t0, t1,
+                                     indexes=True)
+        assert list(i) == sorted(i)
+        for site, (lat, lon) in enumerate(zip(lats, lons)):
+            observer = earth + api.wgs84.latlon(lat, lon)
+            t2 = almanac.find_transits(observer, target, t0, t1)
+            assert len(t2) == sum(i == site) > 0
+            assert abs(t.tt[i == site] - t2.tt).max() < 0.2 / 86400.0
+
+    # Searching in small chunks of sites should not change the result.
+    t, y, i = almanac.find_risings(earth + sites, e['sun'], t0, t1,
+                                   indexes=True)
+    saved = almanac._GRID_CHUNK_SAMPLES
+    almanac._GRID_CHUNK_SAMPLES = 1
+    try:
+        t2, y2, i2 = almanac.find_risings(earth + sites, e['sun'], t0, t1,
+                                          indexes=True)
+    finally:
+        almanac._GRID_CHUNK_SAMPLES = saved
+    assert list(i) == list(i2)
+    assert list(t.tt) == list(t2.tt)
+
+    # A single site can return indexes too; many sites must ask for them.
+    observer = earth + api.wgs84.latlon(lats[1], lons[1])
+    t, y, i = almanac.find_risings(observer, e['sun'], t0, t1, indexes=True)
+    assert list(i) == [0] * len(t)
+    with assert_raises(ValueError, 'pass indexes=True'):
+        almanac.find_risings(earth + sites, e['sun'], t0, t1)
+    with assert_raises(ValueError, 'pass indexes=True'):
+        almanac.find_transits(earth + sites, e['sun'], t0, t1)
+
+def test_daily_almanac():
+    ts = api.load.timescale()
+    t0 = ts.utc(2020, 6, 1)
+    t1 = ts.utc(2020, 6, 15)
+    e = api.load('de421.bsp')
+    lats = [[0.0, 36.7], [-33.9, 69.6]]
+    lons = [[0.0, -112.2], [151.2, 18.9]]
+    sites = api.wgs84.latlon(lats, lons)
+    days = list(almanac.daily_almanac(e, sites, t0, t1, chunk_days=4))
+    assert len(days) == 14
+    assert sorted(days[0][1]) == sorted(almanac.DAILY_EVENTS)
+    assert days[0][1]['sunrise'].shape == (2, 2)
+    for (lat, lon), (r, c) in zip([(-33.9, 151.2), (36.7, -112.2)],
+                                  [(1, 0), (0, 1)]):
+        observer = e['earth'] + api.wgs84.latlon(lat, lon)
+        t, y = almanac.find_settings(observer, e['sun'], t0, t1)
+        sunsets = array([events['sunset'][r, c] for _, events in days])
+        assert abs(sunsets - t.tt).max() < 1.0 / 86400.0
+
+    # The midnight Sun never sets in northern Norway in June.
+    assert all(isnan(events['sunset'][1, 1]) for _, events in days)
+
+def test_find_twilights_matches_dark_twilight_day():
+    ts = api.load.timescale()
+    t0 = ts.utc(2020, 3, 1)
+    t1 = ts.utc(2020, 4, 1)
+    e = api.load('de421.bsp')
+    for lat, lon in (40.8, -83.9), (-33.9, 151.2), (64.1, -21.9):
+        topos = api.wgs84.latlon(lat, lon)
+        f = almanac.dark_twilight_day(e, topos)
+        t, y = almanac.find_discrete(t0, t1, f)
+        t2, y2 = almanac.find_twilights(e['earth'] + topos, e['sun'], t0, t1)
+        assert list(y) == list(y2)
+        assert abs(t.tt - t2.tt).max() < 0.1 / 86400.0
+
+def test_risings_settings_and_transits_for_many_stars():
+    ts = api.load.timescale()
+    t0 = ts.utc(2020, 6, 1)
+    t1 = ts.utc(2020, 6, 4)
+    e = api.load('de421.bsp')
+    observer = e['earth'] + api.wgs84.latlon(40.8, -83.9)
+    ra_hours = [6.7525, 14.2610, 18.6156, 2.5302]
+    dec_degrees = [-16.7161, 19.1824, 38.7837, 89.2641]
+    stars = api.Star(ra_hours=ra_hours, dec_degrees=dec_degrees)
+    for find in almanac.find_risings, almanac.find_settings:
+        t, y, i = find(observer, stars, t0, t1, indexes=True)
+        for n, (ra, dec) in enumerate(zip(ra_hours, dec_degrees)):
+            star = api.Star(ra_hours=ra, dec_degrees=dec)
+            t2, y2 = find(observer, star, t0, t1)
+            assert list(y[i == n]) == list(y2)
+            if y2.all():
+                assert abs(t.tt[i == n] - t2.tt).max() < 0.1 / 86400.0
+    t, i = almanac.find_transits(observer, stars, t0, t1, indexes=True)
+    assert list(i) == sorted(i)
+    assert len(t) == len(i) == 12
+    for n, (ra, dec) in enumerate(zip(ra_hours, dec_degrees)):
+        star = api.Star(ra_hours=ra, dec_degrees=dec)
+        t2 = almanac.find_transits(observer, star, t0, t1)
+        assert abs(t.tt[i == n] - t2.tt).max() < 0.1 / 86400.0
+
+    with assert_raises(ValueError, 'pass indexes=True'):
+        almanac.find_risings(observer, stars, t0, t1)
+    with assert_raises(ValueError, 'pass indexes=True'):
+        almanac.find_transits(observer, stars, t0, t1)
+
+    # An array of stars cannot be combined with an array of sites.
+    sites = api.wgs84.latlon([40.8, -33.9], [-83.9, 151.2])
+    for find in (almanac.find_risings, almanac.find_settings,
+                 almanac.find_transits):
+        with assert_raises(ValueError, 'array of stars from an array'):
+            find(e['earth'] + sites, stars, t0, t1, indexes=True)
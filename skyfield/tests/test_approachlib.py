@@ -0,0 +1,62 @@
+from numpy import array, sqrt
+from skyfield.api import load
+from skyfield.approachlib import close_approaches
+from skyfield.constants import GM_SUN_Pitjeva_2005_km3_s2 as GM_SUN
+from skyfield.keplerlib import _KeplerOrbit as KeplerOrbit, _CONVERT_GM
+from skyfield.units import Distance, Velocity
+
+def _heliocentric_earth(eph, t):
+    return eph['earth'].at(t) - eph['sun'].at(t)
+
+def _orbits(position, velocity, t):
+    mu_au3_d2 = GM_SUN * _CONVERT_GM
+    return KeplerOrbit(Distance(position), Velocity(velocity), t,
+                       mu_au3_d2, 10)
+
+def test_close_approaches():
+    ts = load.timescale()
+    eph = load('de421.bsp')
+    t0 = ts.utc(2020, 6, 1)
+
+    # Four minor planets start near the Earth; the fifth, far away.
+    offset = array([[0.003, 0, 0], [0, 0.02, 0], [0.2, 0, 0],
+                    [0, 0, 0.04], [1.7, 0, 0]]).T
+    kick = array([[0, 0, 0.003], [0.002, 0, 0], [0, 0, 0.003],
+                  [0.003, 0, 0], [0, 0, 0]]).T
+    earth = _heliocentric_earth(eph, t0)
+    position = earth.position.au[:,None] + offset
+    velocity = earth.velocity.au_per_d[:,None] + kick
+    velocity[:,4] = earth.velocity.au_per_d / sqrt(2.7)
+    orbits = _orbits(position, velocity, t0)
+
+    t0, t1 = ts.utc(2020, 5, 1), ts.utc(2020, 7, 1)
+    t, i, distance, speed = close_approaches(orbits, eph, t0, t1)
+    assert list(i) == [0, 1, 3]
+    assert t.utc_strftime('%Y-%m-%d %H:%M') == ['2020-06-01 00:00'] * 3
+    assert abs(distance.au - [0.003, 0.02, 0.04]).max() < 1e-9
+    assert abs(speed.km_per_s - [5.194, 3.463, 5.194]).max() < 1e-3
+
+    t, i, distance, speed = close_approaches(orbits, eph, t0, t1,
+                                             body='moon')
+    assert list(i) == [1, 3, 0]
+    assert t.utc_strftime('%Y-%m-%d %H:%M') == [
+        '2020-05-29 02:55', '2020-05-30 07:02', '2020-06-01 01:25']
+    assert abs(distance.au - [0.019146, 0.039572, 0.005438]).max() < 1e-6
+
+def test_close_approaches_when_no_orbit_comes_near():
+    ts = load.timescale()
+    eph = load('de421.bsp')
+    t0 = ts.utc(2020, 6, 1)
+
+    # Nearly circular orbits out in the asteroid belt, which the MOID
+    # estimate rules out before any orbit is propagated.
+    earth = _heliocentric_earth(eph, t0)
+    scale = array([2.7, 3.1])
+    position = earth.position.au[:,None] * scale
+    velocity = earth.velocity.au_per_d[:,None] / sqrt(scale)
+    orbits = _orbits(position, velocity, t0)
+
+    t0, t1 = ts.utc(2020, 5, 1), ts.utc(2020, 7, 1)
+    t, i, distance, speed = close_approaches(orbits, eph, t0, t1)
+    assert t.shape == i.shape == distance.au.shape == (0,)
+    assert speed.km_per_s.shape == (0,)
@@ -0,0 +1,41 @@
+from numpy import flatnonzero, sqrt, tan
+from skyfield.api import Star, load
+from skyfield.chartlib import ChartCatalog
+from skyfield.constants import tau
+from skyfield.data.hipparcos import load_dataframe
+from skyfield.projections import build_stereographic_projection
+
+def test_chart_matches_projecting_whole_catalog():
+    ts = load.timescale()
+    earth = load('de421.bsp')['earth']
+    with load.open('hip_main.dat.gz') as f:
+        df = load_dataframe(f)
+
+    catalog = ChartCatalog(df)
+    observer = earth.at(ts.utc(2024, 3, 1))
+    center = observer.observe(Star(ra_hours=5.5, dec_degrees=0.0))
+    x, y, magnitude, rows = catalog.chart(observer, center, 20.0, 6.0)
+
+    project = build_stereographic_projection(center)
+    x2, y2 = project(observer.observe(Star.from_dataframe(df)))
+    in_view = sqrt(x2 * x2 + y2 * y2) <= tan(10.0 / 360.0 * tau / 2.0)
+    expected = flatnonzero(in_view & (df['magnitude'].values <= 6.0))
+
+    assert len(rows) == len(expected) > 0
+    assert sorted(rows) == list(expected)
+    assert magnitude.max() <= 6.0
+    assert (abs(x - x2[rows]) < 1e-12).all()
+    assert (abs(y - y2[rows]) < 1e-12).all()
+
+def test_chart_near_celestial_pole():
+    ts = load.timescale()
+    earth = load('de421.bsp')['earth']
+    with load.open('hip_main.dat.gz') as f:
+        df = load_dataframe(f)
+
+    catalog = ChartCatalog(df)
+    observer = earth.at(ts.utc(2024, 3, 1))
+    center = observer.observe(Star(ra_hours=3.0, dec_degrees=89.0))
+    x, y, magnitude, rows = catalog.chart(observer, center, 30.0, 5.0)
+    assert 32349 not in df.index[rows]  # Sirius
+    assert 11767 in df.index[rows]      # Polaris
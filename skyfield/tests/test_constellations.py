@@ -1,3 +1,4 @@
+from numpy import array, linspace, meshgrid
 from skyfield.api import (
     load_constellation_map, load_constellation_names, position_of_radec,
 )
@@ -37,3 +38,30 @@ def test_that_constellation_abbreviations_match():
 
     abbrevs2 = {abbrev for abbrev, name in load_constellation_names()}
     assert abbrevs1 == abbrevs2
+
+def test_constellation_of_radec():
+    lookup = load_constellation_map()
+    assert lookup.constellation_of_radec(0, 90) == 'UMi'
+    assert list(
+        lookup.constellation_of_radec(array([4.65, 4.75]), array([0, 0.3]))
+    ) == ['Eri', 'Ori']
+
+def test_tiled_constellation_map_matches_binary_search():
+    lookup = load_constellation_map()
+    tiled_lookup = load_constellation_map(tile_degrees=0.5)
+
+    ra_hours, dec_degrees = meshgrid(linspace(0, 24, 721, endpoint=False),
+                                     linspace(-90, 90, 361))
+    ra_hours = ra_hours.flatten()
+    dec_degrees = dec_degrees.flatten()
+    expected = lookup(position_of_radec(ra_hours, dec_degrees))
+    assert (tiled_lookup.constellation_of_radec(ra_hours, dec_degrees)
+            == expected).all()
+
+    # Positions exactly on the B1875 boundary lines themselves.
+    arrays = load_bundled_npy('constellations.npz')
+    ra_hours, dec_degrees = meshgrid(arrays['sorted_ra'], arrays['sorted_dec'])
+    B1875 = Time(None, julian_date_of_besselian_epoch(1875))
+    p = position_of_radec(ra_hours.flatten(), dec_degrees.flatten(),
+                          epoch=B1875)
+    assert (tiled_lookup(p) == lookup(p)).all()
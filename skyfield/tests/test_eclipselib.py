@@ -1,4 +1,4 @@
-from skyfield.api import load
+from skyfield.api import load, wgs84
 from skyfield import eclipselib
 
 def test_lunar_eclipses():
@@ -14,3 +14,67 @@ def test_lunar_eclipses():
     assert len(t) == len(y) == 2
     for name, item in details.items():
         assert len(item) == len(t)
+
+def test_lunar_eclipses_reuse_cached_full_moons():
+    ts = load.timescale()
+    eph = load('de421.bsp')
+
+    t0 = ts.utc(2019, 1, 1)
+    t1 = ts.utc(2020, 1, 1)
+    t, y, details = eclipselib.lunar_eclipses(t0, t1, eph)
+    k, tt = eclipselib._full_moon_cache[eph]
+    assert len(tt) == 12
+
+    # A wider search extends the cache, without disturbing the dates
+    # already found.
+    t2, y2, details = eclipselib.lunar_eclipses(ts.utc(2018), ts.utc(2021),
+                                                eph)
+    k2, tt2 = eclipselib._full_moon_cache[eph]
+    assert k2 == k - 13
+    assert (tt2[13:25] == tt).all()
+    assert list(y2[2:4]) == list(y)
+    assert (t2.tt[2:4] == t.tt).all()
+
+def test_solar_eclipses():
+    ts = load.timescale()
+    eph = load('de421.bsp')
+
+    t0 = ts.utc(2023, 1, 1)
+    t1 = ts.utc(2025, 1, 1)
+    t, y, details = eclipselib.solar_eclipses(t0, t1, eph)
+
+    # Greatest eclipse, gamma, and type as given by NASA.
+    assert t.tt_strftime('%Y-%m-%d %H:%M') == [
+        '2023-04-20 04:18', '2023-10-14 18:01',
+        '2024-04-08 18:18', '2024-10-02 18:46',
+    ]
+    assert list(y) == [2, 1, 2, 1]
+    assert abs(details['gamma'] - [-0.3952, 0.3753, 0.3431, -0.3509]).max() \
+        < 1e-4
+    assert abs(details['magnitude'] - [1.0132, 0.9520, 1.0566, 0.9326]).max() \
+        < 1e-3
+
+def test_local_circumstances():
+    ts = load.timescale()
+    eph = load('de421.bsp')
+
+    t0 = ts.utc(2017, 8, 21)
+    t1 = ts.utc(2017, 8, 22)
+    t, y, details = eclipselib.solar_eclipses(t0, t1, eph)
+    elements = eclipselib.besselian_elements(t[0], eph)
+
+    # Nashville, New York, and London.
+    sites = wgs84.latlon([36.1627, 40.7128, 51.5], [-86.7816, -74.006, -0.12])
+    t, code, details = elements.local_circumstances(sites)
+    assert list(code) == [2, 0, 0]
+    assert t.utc_strftime('%H:%M:%S')[:2] == ['18:28:23', '18:44:58']
+    assert abs(details['obscuration'] - [1.0, 0.715, 0.040]).max() < 1e-3
+
+    # The contacts agree with a brute-force search, made by stepping
+    # topocentric positions of the Sun and Moon one second at a time.
+    contacts = ts.tt_jd([details['partial_begin_tt'][0],
+                         details['central_begin_tt'][0],
+                         details['central_end_tt'][0]])
+    assert contacts.utc_strftime('%H:%M:%S') == [
+        '16:58:29', '18:27:28', '18:29:19']
+    assert details['central_begin_tt'][1] != details['central_begin_tt'][1]
@@ -5,7 +5,10 @@ from skyfield.units import Distance, Angle, Velocity
 from skyfield.constants import DAY_S
 from skyfield.elementslib import (
     OsculatingElements,
+    _ELEMENT_FIELDS,
+    _elements_array,
     normpi,
+    osculating_elements_array,
     osculating_elements_of,
 )
 from skyfield.keplerlib import ele_to_vec
@@ -596,6 +599,46 @@ def test_all_types_at_once(ts):
                 v=array([ 1, 5,    3,  5,  5,    3, 5, 5,    3,  .5,  .5,   .5]),
                 ts=ts)
 
+def test_elements_array_matches_elements_object(ts):
+    e = array([0, 0, 0, .3, .3, .2, 1, 1, 1, 1.3, 1.3, 1.3])
+    i = array([.5, 0, pi/2, .1, 0, pi/2, 2, 0, pi/2, 2, 0, pi/2])
+    Om = array([1, 0, 1, 2, 0, 1, 3, 0, 1, 3, 0, 1])
+    w = array([0, 0, 0, 4, 4, 2, 4, 4, 2, 4, 4, 2])
+    v = array([1, 5, 3, 5, 5, 3, 5, 5, 3, .5, .5, .5])
+    mu = 403503.2355022598
+    pos_vec, vel_vec = ele_to_vec(300000, e, i, Om, w, v, mu)
+    time = ts.tt(jd=repeat(ts.utc(2018).tt, 12))
+    elements = OsculatingElements(Distance(km=pos_vec),
+                                  Velocity(km_per_s=vel_vec),
+                                  time, mu)
+    records = _elements_array(pos_vec, vel_vec, time.tdb, mu)
+    for name in _ELEMENT_FIELDS:
+        if name.endswith('_km'):
+            expected = getattr(elements, name[:-3]).km
+        elif name == 'periapsis_time_tdb':
+            expected = elements.periapsis_time.tdb
+        elif name == 'mean_motion_per_day':
+            expected = elements.mean_motion_per_day.radians
+        else:
+            expected = getattr(elements, name)
+            expected = getattr(expected, 'radians', expected)
+        finite = expected < inf
+        assert (records[name][~finite] == expected[~finite]).all()
+        compare(records[name][finite], expected[finite], 1e-6)
+
+def test_elements_array_of_a_position(ts):
+    t = ts.tdb(2015, 3, 2, linspace(0, 24, 5))
+    position = (moon - earth).at(t)
+    elements = osculating_elements_of(position, ECLIPTIC)
+    records = osculating_elements_array(position, ECLIPTIC)
+    assert records.shape == (5,)
+    compare(records['eccentricity'], elements.eccentricity, 1e-15)
+    compare(records['periapsis_time_tdb'], elements.periapsis_time.tdb, 1e-9)
+    records = osculating_elements_array(position[0], ECLIPTIC)
+    assert records.shape == ()
+    compare(float(records['inclination']), elements.inclination.radians[0],
+            1e-15)
+
 def test_gm_calculation(ts):
     geocentric_pos = (moon - earth).at(ts.tdb(2015, 3, 2, 2))
     geocentric_elements = osculating_elements_of(geocentric_pos, ECLIPTIC)
@@ -1,10 +1,16 @@
+import gzip
 import os
-from numpy import pi, seterr, linspace
+import shutil
+import tempfile
+from numpy import array, linspace, pi, seterr
 
 from skyfield.api import load
 from skyfield.constants import GM_SUN_Pitjeva_2005_km3_s2 as GM_SUN
 from skyfield.data import mpc
-from skyfield.keplerlib import _KeplerOrbit as KeplerOrbit, propagate, _CONVERT_GM
+from skyfield.keplerlib import (
+    _KeplerOrbit as KeplerOrbit, _CONVERT_GM, propagate, propagate_in_tiles,
+)
+from skyfield.tests.fixes import InlineExecutor
 from skyfield.tests.test_elementslib import compare, ele_to_vec
 from skyfield.units import Angle, Distance, Velocity
 
@@ -98,6 +104,68 @@ def test_minor_planet_with_negative_M():
     assert abs(ra._degrees - 92.750) < 0.006
     assert abs(dec.degrees - -10.561) < 0.002
 
+TWO_MINOR_PLANETS = (
+    b'00001    3.4   0.15 K205V 162.68631   73.73161   80.28698'
+    b'   10.58862  0.0775571  0.21406009   2.7676569  0 MPO492748'
+    b'  6751 115 1801-2019 0.60 M-v 30h Williams   0000      '
+    b'(1) Ceres              20190915\n'
+    b'00002    4.11  0.15 K221L 272.47992  310.69724  172.91658'
+    b'   34.92531  0.2299930  0.21366046   2.7711069  0 MPO681823'
+    b'  8875 119 1804-2022 0.58 M-c 28k Pan        0000      '
+    b'(2) Pallas             20220105\n'
+)
+
+def test_many_minor_planets_as_one_orbit():
+    ts = load.timescale()
+    t = ts.utc(2022, 9, 14)
+    df = mpc.load_mpcorb_dataframe(BytesIO(TWO_MINOR_PLANETS))
+    orbits = mpc.mpcorb_orbits(df, ts, GM_SUN)
+    position = orbits.at(t).position.au
+    assert position.shape == (3, 2)
+    assert list(orbits.target) == ['(1) Ceres', '(2) Pallas']
+    for i in range(2):
+        orbit = mpc.mpcorb_orbit(df.iloc[i], ts, GM_SUN)
+        assert abs(orbit.at(t).position.au - position[:,i]).max() < 1e-13
+
+    # The orbit's own budget and executor decide how it is tiled.
+    orbits.memory_bytes = 240
+    orbits.executor = InlineExecutor()
+    assert (orbits.at(t).position.au == position).all()
+    assert orbits.executor.calls == 2
+
+def test_fast_mpcorb_parser_and_column_cache():
+    header = (b'MINOR PLANET CENTER ORBIT DATABASE (MPCORB)\n\n'
+              b"Des'n     H     G   Epoch     M        Peri.\n"
+              + b'-' * 202 + b'\n')
+    slow = mpc.load_mpcorb_dataframe(BytesIO(TWO_MINOR_PLANETS))
+    fast = mpc.load_mpcorb_dataframe(BytesIO(header + TWO_MINOR_PLANETS),
+                                     slow=False)
+    assert list(fast.columns) == list(mpc._MPCORB_FAST_COLUMNS)
+    for name in fast.columns:
+        assert list(fast[name]) == list(slow[name])
+
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, 'MPCORB.DAT.gz')
+        with gzip.open(path, 'wb') as f:
+            f.write(header + TWO_MINOR_PLANETS)
+
+        columns = mpc.load_mpcorb_columns(path)
+        assert os.path.isdir(path + '.columns')
+        assert list(columns['designation']) == ['(1) Ceres', '(2) Pallas']
+
+        columns = mpc.load_mpcorb_columns(path, magnitude_limit=4.0)
+        assert list(columns['designation']) == ['(1) Ceres']
+
+        ts = load.timescale()
+        t = ts.utc(2022, 9, 14)
+        orbit = mpc.mpcorb_orbits(columns, ts, GM_SUN)
+        expected = mpc.mpcorb_orbit(slow.iloc[0], ts, GM_SUN)
+        difference = orbit.at(t).position.au - expected.at(t).position.au
+        assert abs(difference).max() < 1e-13
+    finally:
+        shutil.rmtree(directory)
+
 def test_comet():
     text = (b'    CJ95O010  1997 03 29.6333  0.916241  0.994928  130.6448'
             b'  283.3593   88.9908  20200224  -2.0  4.0  C/1995 O1 (Hale-Bopp)'
@@ -151,6 +219,32 @@ def test_comet_with_eccentricity_of_exactly_one():
     assert str(ra).startswith('18h 46m 46.4')
     assert str(dec).startswith("-72deg 05' 33.")
 
+def test_propagating_in_tiles_matches_one_call():
+    p = linspace(300000, 900000, 7)
+    e = linspace(0.0, 1.5, 7)
+    pos, vel = ele_to_vec(p, e, 0.5, 1.0, 2.0, linspace(-0.5, 0.5, 7), mu)
+    t0 = linspace(-1e5, 1e5, 7)
+    t1 = linspace(-1e7, 1e7, 5)
+    position, velocity = propagate(pos, vel, t0, t1, mu)
+    tile_bytes = 240 * 3
+    for executor in None, InlineExecutor():
+        position2, velocity2 = propagate_in_tiles(
+            pos, vel, t0, t1, mu, tile_bytes, executor)
+        assert (position2 == position).all()
+        assert (velocity2 == velocity).all()
+    assert executor.calls == 14
+
+def test_each_orbit_converges_at_its_own_pace():
+    pos, vel = ele_to_vec(array([300000.0, 300000.0]), array([0.1, 5.0]),
+                          0.5, 1.0, 2.0, 0.1, mu)
+    t1 = linspace(-1e8, 1e8, 3)
+    position, velocity, iterations = propagate(pos, vel, 0.0, t1, mu, True)
+    assert iterations.shape == (2, 3)
+    assert iterations[0].max() < iterations[1].max()
+    for i in 0, 1:
+        position2, velocity2 = propagate(pos[:,i], vel[:,i], 0.0, t1, mu)
+        assert abs(position2 - position[:,i]).max() < 1e-6
+
 # Test various round-trips through the kepler orbit object.
 
 def _data_path(filename):
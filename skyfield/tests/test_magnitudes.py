@@ -1,5 +1,7 @@
+from assay import assert_raises
+from numpy import array, isnan, nan_to_num
 from skyfield.api import load
-from skyfield.magnitudelib import planetary_magnitude
+from skyfield.magnitudelib import planetary_magnitude, planetary_magnitudes
 
 def test_magnitudes():
     ts = load.timescale()
@@ -31,3 +33,24 @@ def test_magnitudes():
         ['5.701', '5.701'],
         ['7.690', '7.690'],
     ]
+
+def test_planetary_magnitudes():
+    ts = load.timescale()
+    eph = load('de421.bsp')
+    names = [
+        'mercury', 'venus', 'mars', 'jupiter barycenter',
+        'saturn barycenter', 'uranus barycenter', 'neptune barycenter',
+        'mars barycenter',
+    ]
+    for t in ts.utc(2021, 10, 4), ts.utc(1995, 5, range(1, 100, 7)):
+        e = eph['earth'].at(t)
+        positions = [e.observe(eph[name]) for name in names]
+        expected = array([planetary_magnitude(p) for p in positions])
+        magnitudes = planetary_magnitudes(positions)
+        assert magnitudes.shape == expected.shape
+        assert (isnan(magnitudes) == isnan(expected)).all()
+        assert (nan_to_num(magnitudes) == nan_to_num(expected)).all()
+
+    e2 = eph['earth'].at(ts.utc(2021, 10, 5))
+    with assert_raises(ValueError, 'same observer'):
+        planetary_magnitudes([e.observe(eph['mars']), e2.observe(eph['venus'])])
@@ -289,3 +289,54 @@ def test_unloaded_bpc():
             'you have not yet loaded a binary PCK file'
             ' that has a segment for frame 31006'
         )
+
+def test_frame_reuses_rotation_for_same_dates():
+    pc = PlanetaryConstants()
+    pc.read_text(load('moon_080317.tf'))
+    pc.read_binary(load('moon_pa_de421_1900-2050.bpc'))
+    frame = pc.build_frame_named('MOON_PA_DE421')
+
+    ts = load.timescale()
+    t = ts.tdb_jd(T0)
+    R = frame._rotation_at(t)
+    assert frame._rotation_at(ts.tdb_jd(T0)) is R
+    assert frame._rotation_at(ts.tdb_jd(T0 + 1.0)) is not R
+
+    R, dRdt = frame._rotation_and_rate_at(t)
+    R2, dRdt2 = frame._rotation_and_rate_at(ts.tdb_jd(T0))
+    assert R2 is R and dRdt2 is dRdt
+
+    # Callers receive copies, which they are free to modify.
+    R = frame.rotation_at(t)
+    R *= 2.0
+    assert (frame.rotation_at(t) * 2.0 == R).all()
+    R, dRdt = frame.rotation_and_rate_at(t)
+    dRdt[:] = 0.0
+    assert frame.rotation_and_rate_at(t)[1].any()
+
+def test_array_of_locations_on_moon():
+    ts = load.timescale()
+    t = ts.utc(2019, 12, [13, 14])
+
+    pc = PlanetaryConstants()
+    pc.read_text(load('moon_080317.tf'))
+    pc.read_text(load('pck00008.tpc'))
+    pc.read_binary(load('moon_pa_de421_1900-2050.bpc'))
+    frame = pc.build_frame_named('MOON_ME_DE421')
+    eph = load('de421.bsp')
+
+    lats = np.array([26.3, -45.0, 80.5])
+    lons = np.array([313.2, 10.0, 190.0])
+    sites = pc.build_latlon_degrees(frame, lats, lons)
+    p = (eph['moon'] + sites).at(t)
+    assert p.position.au.shape == (3, 3, 2)
+    R = sites.rotation_at(t)
+    assert R.shape == (3, 3, 3, 2)
+
+    for i, (lat, lon) in enumerate(zip(lats, lons)):
+        site = pc.build_latlon_degrees(frame, lat, lon)
+        p1 = (eph['moon'] + site).at(t)
+        assert abs(p.position.au[:,i] - p1.position.au).max() < 1e-15
+        v = p1.velocity.au_per_d
+        assert abs(p.velocity.au_per_d[:,i] - v).max() < 1e-15
+        assert abs(R[:,:,i] - site.rotation_at(t)).max() < 1e-15
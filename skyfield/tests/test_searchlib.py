@@ -1,5 +1,14 @@
-from numpy import array
-from skyfield.searchlib import _choose_brackets, _identify_maxima
+import os
+import shutil
+import tempfile
+from numpy import array, concatenate, cos, linspace, pi, sin, unique
+from skyfield.api import load
+from skyfield.searchlib import (
+    EventTable, _choose_brackets, _find_discrete,
+    _find_transitions_in_parallel, _identify_maxima, cached_event_table,
+    find_discrete, find_maxima, find_minima, find_zeros, record_searches,
+)
+from .fixes import InlineExecutor
 
 def test_brackets_of_simple_peak():
     y = array((10, 11, 12, 11, 10))
@@ -41,3 +50,218 @@ def test_both_kinds_of_maxima_at_once():
     x, y = _identify_maxima(x, y)
     assert list(x) == [2451547.5, 2451550.0]
     assert list(y) == [12, 13]
+
+def _recording(f, times):
+    def g(t):
+        times.append(t.tt)
+        return f(t)
+    g.step_days = 1.0
+    return g
+
+def test_find_discrete_never_recomputes_known_values():
+    ts = load.timescale(builtin=True)
+    jd = linspace(2451545.0, 2451555.0, 11)
+    f = lambda t: (t.tt > 2451549.3).astype(int)
+    y = f(ts.tt_jd(jd))
+    times = []
+    t, y = _find_discrete(ts, jd, _recording(f, times), 1e-8, 12, y)
+    assert abs(t.tt[0] - 2451549.3) < 1e-8
+    assert list(y) == [1]
+    times = concatenate(times)
+    assert len(unique(times)) == len(times)
+    assert not set(times) & set(jd)
+
+def test_find_maxima_never_recomputes_known_values():
+    ts = load.timescale(builtin=True)
+    f = lambda t: -(t.tt - 2451549.3) ** 2
+    times = []
+    t, y = find_maxima(ts.tt_jd(2451545.0), ts.tt_jd(2451555.0),
+                       _recording(f, times))
+    assert abs(t.tt[0] - 2451549.3) < 1.0 / 86400.0
+    times = concatenate(times)
+    assert len(unique(times)) == len(times)
+
+def test_partitioned_find_discrete_matches_serial_search():
+    ts = load.timescale(builtin=True)
+    f = lambda t: ((t.tt - 2451545.0) // 0.7).astype(int) % 3
+    f.step_days = 0.2
+    t0 = ts.tt_jd(2451545.1)
+    t1 = ts.tt_jd(2451575.1)
+    t, y = find_discrete(t0, t1, f)
+    for partitions in 1, 2, 7, 1000:
+        executor = InlineExecutor()
+        t2, y2 = find_discrete(t0, t1, f, executor=executor,
+                               partitions=partitions)
+        assert list(t2.tt) == list(t.tt)
+        assert list(y2) == list(y)
+
+def test_partitions_are_refined_for_as_many_rounds_as_serial_search():
+    # The first partition's brackets reach epsilon after 2 rounds, but
+    # the wider brackets of the second partition would need 3.
+    ts = load.timescale(builtin=True)
+    jd = 2451545.0 + array([0.0, 1.0, 2.0, 3.2, 4.4])
+    f = lambda t: ((t.tt - 2451545.0) // 0.55).astype(int)
+    t, y = _find_discrete(ts, jd, f, 0.011, 11)
+    executor = InlineExecutor()
+    jd2, y2, rounds = _find_transitions_in_parallel(ts, jd, f, 0.011, 11,
+                                                    executor, 2)
+    assert executor.calls == 3
+    assert rounds == 2
+    assert list(jd2) == list(t.tt)
+    assert list(y2) == list(y)
+
+def _wave(t):
+    return sin((t.tt - 2451545.0) * pi / 3.0)
+
+def _wave_rate(t):
+    return cos((t.tt - 2451545.0) * pi / 3.0) * pi / 3.0
+
+def _wave_acceleration(t):
+    return -_wave(t) * (pi / 3.0) ** 2
+
+def test_find_zeros_with_and_without_rates():
+    ts = load.timescale(builtin=True)
+    t0 = ts.tt_jd(2451545.5)
+    t1 = ts.tt_jd(2451557.5)
+
+    def f(t):
+        return _wave(t)
+    f.step_days = 1.0
+
+    def f_and_rate(t):
+        return _wave(t), _wave_rate(t)
+    f_and_rate.step_days = 1.0
+
+    for t, y in [find_zeros(t0, t1, f),
+                 find_zeros(t0, t1, f, rate=_wave_rate),
+                 find_zeros(t0, t1, f_and_rate)]:
+        assert max(abs(t.tt - 2451545.0 - [3, 6, 9, 12])) < 1e-8
+        assert list(y) == [0, 1, 0, 1]
+
+def test_find_zeros_with_adaptive_steps():
+    ts = load.timescale(builtin=True)
+    t0 = ts.tt_jd(2451545.5)
+    t1 = ts.tt_jd(2451645.5)
+    times = []
+
+    def f(t):
+        times.append(t.tt)
+        return _wave(t) - 0.99
+    f.step_days = 0.05
+
+    t_uniform, y_uniform = find_zeros(t0, t1, f)
+    uniform_count = len(concatenate(times))
+    del times[:]
+
+    f.max_rate = pi / 3.0
+    t, y = find_zeros(t0, t1, f)
+    assert len(concatenate(times)) < uniform_count / 2
+    assert len(t) == 34
+    assert max(abs(t.tt - t_uniform.tt)) < 1e-8
+    assert list(y) == list(y_uniform)
+
+def test_find_maxima_and_minima_using_rates():
+    ts = load.timescale(builtin=True)
+    t0 = ts.tt_jd(2451545.5)
+    t1 = ts.tt_jd(2451557.5)
+
+    def f(t):
+        return _wave(t)
+    f.step_days = 1.0
+
+    def rate_and_acceleration(t):
+        return _wave_rate(t), _wave_acceleration(t)
+
+    for rate in _wave_rate, rate_and_acceleration:
+        t, y = find_maxima(t0, t1, f, rate=rate)
+        assert max(abs(t.tt - 2451545.0 - [1.5, 7.5])) < 1.0 / 86400.0
+        assert max(abs(y - 1.0)) < 1e-12
+
+        t, y = find_minima(t0, t1, f, rate=rate)
+        assert max(abs(t.tt - 2451545.0 - [4.5, 10.5])) < 1.0 / 86400.0
+        assert max(abs(y + 1.0)) < 1e-12
+
+def test_record_searches():
+    ts = load.timescale(builtin=True)
+    t0 = ts.tt_jd(2451545.5)
+    t1 = ts.tt_jd(2451557.5)
+
+    def f(t):
+        return _wave(t)
+    f.step_days = 1.0
+
+    def g(t):
+        return _wave(t) > 0.0
+    g.step_days = 1.0
+
+    find_maxima(t0, t1, f)
+    with record_searches() as records:
+        find_maxima(t0, t1, f)
+        find_minima(t0, t1, f, rate=_wave_rate)
+        find_zeros(t0, t1, f)
+        with record_searches() as inner_records:
+            find_discrete(t0, t1, g)
+    find_maxima(t0, t1, f)
+
+    assert [r.routine for r in records] == [
+        'find_maxima', 'find_minima', 'find_zeros', 'find_discrete',
+    ]
+    assert inner_records == records[-1:]
+    for r in records:
+        assert r.calls > r.rounds > 0
+        assert r.samples >= r.calls
+        assert r.seconds >= 0.0
+    assert records[0].function == 'f'
+    assert records[0].step_days == 1.0
+    assert repr(records[0]).startswith('<SearchRecord find_maxima of f: ')
+
+def test_event_table_matches_live_search():
+    ts = load.timescale(builtin=True)
+    calls = []
+
+    def f(t):
+        calls.append(t)
+        return ((t.tt - 2451545.0) // 0.7).astype(int) % 3
+    f.step_days = 0.2
+
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, 'events.npz')
+        t0 = ts.tt_jd(2451550.0)
+        t1 = ts.tt_jd(2451560.0)
+        table = cached_event_table(path, f, t0, t1)
+        assert os.path.exists(path)
+
+        del calls[:]
+        table = cached_event_table(path, f, t0, ts.tt_jd(2451555.0))
+        t, y = table.find(ts.tt_jd(2451552.5), ts.tt_jd(2451557.5))
+        assert not calls
+        assert len(t) == 7
+
+        for jd0, jd1 in [(2451552.5, 2451557.5), (2451547.5, 2451552.5),
+                         (2451557.5, 2451562.5), (2451547.5, 2451562.5)]:
+            t0 = ts.tt_jd(jd0)
+            t1 = ts.tt_jd(jd1)
+            t, y = table.find(t0, t1)
+            t2, y2 = find_discrete(t0, t1, f)
+            assert abs(t.tt - t2.tt).max() < 1e-8
+            assert list(y) == list(y2)
+        assert calls
+
+        table = cached_event_table(path, f, t0, ts.tt_jd(2451565.0))
+        assert table.tt_end == 2451565.0
+        assert isinstance(EventTable.load(path, f, ts), EventTable)
+
+        # A table built by a different function is not reused.
+        def g(t):
+            return ((t.tt - 2451545.0) // 1.3).astype(int) % 2
+        g.step_days = 0.2
+
+        table = cached_event_table(path, g, t0, t1)
+        t, y = table.find(t0, t1)
+        t2, y2 = find_discrete(t0, t1, g)
+        assert table.key != EventTable.build(f, t0, t1).key
+        assert abs(t.tt - t2.tt).max() < 1e-8
+        assert list(y) == list(y2)
+    finally:
+        shutil.rmtree(directory)
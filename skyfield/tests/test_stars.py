@@ -1,8 +1,85 @@
+import os
+import shutil
+import tempfile
 from skyfield import api
-from skyfield.data.hipparcos import load_dataframe
+from skyfield.data.hipparcos import load_columns, load_dataframe
+from skyfield.functions import length_of
 
 def test_dataframe():
     with api.load.open('hip_main.dat.gz') as f:
         df = load_dataframe(f)
     star = api.Star.from_dataframe(df)
     assert repr(star) == 'Star(ra shape=9933, dec shape=9933, ra_mas_per_year shape=9933, dec_mas_per_year shape=9933, parallax_mas shape=9933, epoch shape=9933)'
+
+def test_cached_columns():
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, 'hip_main.dat.gz')
+        shutil.copy('hip_main.dat.gz', path)
+        with open(path, 'rb') as f:
+            df = load_dataframe(f)
+
+        columns = load_columns(path)
+        assert os.path.isdir(path + '.columns')
+        assert len(columns['hip']) == len(df)
+
+        columns = load_columns(path, ['hip', 'magnitude'], 3.0)
+        assert sorted(columns) == ['hip', 'magnitude']
+        assert list(columns['magnitude'][:3]) == [-1.44, -0.62, -0.05]
+        assert columns['magnitude'][-1] <= 3.0
+        assert len(columns['hip']) == (df['magnitude'] <= 3.0).sum()
+
+        columns = load_columns(path, magnitude_limit=3.0)
+        star = api.Star.from_dataframe(columns)
+        assert star.ra.hours.shape == (len(columns['hip']),)
+        i = list(columns['hip']).index(32349)  # Sirius
+        assert star.ra.hours[i] == df.loc[32349, 'ra_hours']
+    finally:
+        shutil.rmtree(directory)
+
+def test_propagated_star_matches_original():
+    ts = api.load.timescale()
+    earth = api.load('de421.bsp')['earth']
+    with api.load.open('hip_main.dat.gz') as f:
+        df = load_dataframe(f)
+    df = df[df['ra_degrees'].notnull()]
+    star = api.Star.from_dataframe(df)
+    propagated = star.propagated_to(ts.tt(2024, 3, 1))
+    assert propagated.epoch == ts.tt(2024, 3, 1).tt
+    assert abs(length_of(propagated._unit_vector) - 1.0).max() < 1e-15
+
+    # A star rebuilt from the copy's attributes should agree with it,
+    # so none of those attributes can have been left stale.
+    rebuilt = api.Star(
+        ra=propagated.ra, dec=propagated.dec,
+        ra_mas_per_year=propagated.ra_mas_per_year,
+        dec_mas_per_year=propagated.dec_mas_per_year,
+        parallax_mas=propagated.parallax_mas,
+        radial_km_per_s=propagated.radial_km_per_s,
+        epoch=propagated.epoch,
+    )
+
+    for t in (ts.tt(1991, 4, 2), ts.tt(2024, 3, 1), ts.tt(2024, 3, 1, 18),
+              ts.tt(2024, 3, 2, 6), ts.tt(2050, 1, 1)):
+        ra1, dec1, d1 = earth.at(t).observe(star).radec()
+        ra2, dec2, d2 = earth.at(t).observe(propagated).radec()
+        ra3, dec3, d3 = earth.at(t).observe(rebuilt).radec()
+        assert abs(ra1.hours - ra2.hours).max() < 1e-10
+        assert abs(dec1.degrees - dec2.degrees).max() < 1e-10
+        assert abs(d1.au / d2.au - 1.0).max() < 1e-12
+        assert abs(ra2.hours - ra3.hours).max() < 1e-10
+        assert abs(dec2.degrees - dec3.degrees).max() < 1e-10
+
+    barnard = api.Star(ra_hours=(17, 57, 48.49803),
+                       dec_degrees=(4, 41, 36.2072),
+                       ra_mas_per_year=-798.71,
+                       dec_mas_per_year=+10337.77,
+                       parallax_mas=545.4,
+                       radial_km_per_s=-110.6)
+    moved = barnard.propagated_to(ts.tt(2100, 1, 1))
+    assert moved.parallax_mas > barnard.parallax_mas  # it's approaching
+
+    # Barnard's Star's radial velocity grows by about 4.4 m/s per year.
+    difference = moved.radial_km_per_s - barnard.radial_km_per_s
+    assert 0.4 < difference < 0.5
+    assert abs(moved.dec_mas_per_year - barnard.dec_mas_per_year) > 1.0
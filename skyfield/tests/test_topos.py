@@ -2,7 +2,7 @@ from assay import assert_raises
 from numpy import abs, arange, sqrt
 
 from skyfield import constants
-from skyfield.api import Distance, load, wgs84, wms
+from skyfield.api import Distance, EarthSatellite, load, wgs84, wms
 from skyfield.functions import length_of
 from skyfield.positionlib import Apparent, Barycentric
 from skyfield.toposlib import ITRSPosition, iers2010
@@ -265,3 +265,80 @@ def test_deprecated_position_subpoint_method(ts, angle):
     error_degrees = abs(b.longitude.degrees - angle)
     error_mas = 60.0 * 60.0 * 1000.0 * error_degrees
     assert error_mas < 0.1
+
+def test_satellite_altaz_from_array_of_sites(ts):
+    line1 = ('1 25544U 98067A   14020.93268519  .00009878  00000-0'
+             '  18200-3 0  5082')
+    line2 = ('2 25544  51.6498 109.4756 0003572  55.9686 274.8005'
+             ' 15.49815350868473')
+    sat = EarthSatellite(line1, line2, 'ISS', ts)
+    latitudes = [[40.0, 10.0, -30.0], [51.5, 0.0, 60.0]]
+    longitudes = [[-80.0, 20.0, 150.0], [0.0, -20.0, 10.0]]
+    elevations = [[100.0, 0.0, 10.0], [20.0, 0.0, 3000.0]]
+    sites = wgs84.latlon_sites(latitudes, longitudes, elevations)
+
+    for t in ts.utc(2014, 1, 21, 11), ts.utc(2014, 1, 21, 11, [0, 10, 20]):
+        alt, az, distance = (sat - sites).at(t).altaz()
+        assert alt.degrees.shape == (2, 3) + t.shape
+        for i in range(2):
+            for j in range(3):
+                site = wgs84.latlon(latitudes[i][j], longitudes[i][j],
+                                    elevations[i][j])
+                alt2, az2, distance2 = (sat - site).at(t).altaz()
+                assert abs(alt.degrees[i,j] - alt2.degrees).max() < 1e-12
+                assert abs(az.degrees[i,j] - az2.degrees).max() < 1e-12
+                assert abs(distance.m[i,j] - distance2.m).max() < 1e-6
+
+def test_observing_planet_from_array_of_sites(ts):
+    t = ts.utc(2020, 11, 3, 17, [5, 6])
+    eph = load('de421.bsp')
+    earth, mars = eph['earth'], eph['mars']
+    latitudes = [40.0, -33.9, 69.6]
+    longitudes = [-80.0, 151.2, 18.9]
+    sites = wgs84.latlon_sites(latitudes, longitudes)
+    apparent = (earth + sites).at(t).observe(mars).apparent()
+    alt, az, distance = apparent.altaz()
+    ha, dec, distance = apparent.hadec()
+    assert alt.degrees.shape == ha.hours.shape == (3, 2)
+    for i, (lat, lon) in enumerate(zip(latitudes, longitudes)):
+        observer = earth + wgs84.latlon(lat, lon)
+        apparent2 = observer.at(t).observe(mars).apparent()
+        alt2, az2, distance2 = apparent2.altaz()
+        ha2, dec2, distance2 = apparent2.hadec()
+        assert abs(alt.degrees[i] - alt2.degrees).max() < 1e-10
+        assert abs(az.degrees[i] - az2.degrees).max() < 1e-10
+        assert abs(ha.hours[i] - ha2.hours).max() < 1e-10
+        assert abs(dec.degrees[i] - dec2.degrees).max() < 1e-10
+
+def test_satellite_rates_and_sunlight_from_array_of_sites(ts):
+    line1 = ('1 25544U 98067A   14020.93268519  .00009878  00000-0'
+             '  18200-3 0  5082')
+    line2 = ('2 25544  51.6498 109.4756 0003572  55.9686 274.8005'
+             ' 15.49815350868473')
+    sat = EarthSatellite(line1, line2, 'ISS', ts)
+    eph = load('de421.bsp')
+    latitudes = [40.0, -33.9, 69.6]
+    longitudes = [-80.0, 151.2, 18.9]
+    t = ts.utc(2014, 1, 21, 11, [0, 10, 20])  # as many times as sites
+
+    # By default, an array of sites is paired with an array of times.
+    assert wgs84.subpoint_of(sat.at(t)).at(t).position.au.shape == (3, 3)
+    sites = wgs84.latlon(latitudes, longitudes)
+    assert (sat - sites).at(t).position.au.shape == (3, 3)
+
+    sites = wgs84.latlon_sites(latitudes, longitudes)
+    position = (sat - sites).at(t)
+    ha, dec, distance = position.hadec()
+    rates = position.frame_latlon_and_rates(sites)
+    sunlit = position.is_sunlit(eph)
+    assert ha.hours.shape == rates[5].km_per_s.shape == sunlit.shape == (3, 3)
+    for i, (lat, lon) in enumerate(zip(latitudes, longitudes)):
+        site = wgs84.latlon(lat, lon)
+        position2 = (sat - site).at(t)
+        ha2, dec2, distance2 = position2.hadec()
+        rates2 = position2.frame_latlon_and_rates(site)
+        assert abs(ha.hours[i] - ha2.hours).max() < 1e-10
+        assert abs(rates[3].degrees.per_minute[i]
+                   - rates2[3].degrees.per_minute).max() < 1e-10
+        assert abs(rates[5].km_per_s[i] - rates2[5].km_per_s).max() < 1e-10
+        assert list(sunlit[i]) == list(position2.is_sunlit(eph))
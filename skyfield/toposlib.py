@@ -6,7 +6,8 @@ from .constants import ANGVEL, DAY_S, RAD2DEG, T0, pi, tau
 from .earthlib import refract
 from .framelib import itrs
 from .functions import (
-    _T, angular_velocity_matrix, mxm, mxv, rot_y, rot_z,
+    _T, _sites_mxm, _sites_mxv, angular_velocity_matrix, mxm, mxv,
+    rot_y, rot_z,
 )
 from .descriptorlib import reify
 from .units import Angle, Distance, _ltude
@@ -125,6 +126,31 @@ class GeographicPosition(ITRSPosition):
         R = mxv(self._R_lat, _EARTH_ANGULAR_VELOCITY_VECTOR)
         return angular_velocity_matrix(R)
 
+class GeographicSites(GeographicPosition):
+    """An array of latitude-longitude-elevation positions on Earth.
+
+    Where a `GeographicPosition` built from arrays pairs each site with
+    the corresponding time in an array of times, this subclass instead
+    computes every site at every time.  Its positions, and those of the
+    targets observed from it, have dimensions for the sites ahead of any
+    dimension for time.  Build one with `Geoid.latlon_sites()`.
+
+    """
+    def _at(self, t):
+        """Compute GCRS position and velocity at time `t`."""
+        RT = _T(itrs.rotation_at(t))
+        r = _sites_mxv(RT, self.itrs_xyz.au)
+        v = _sites_mxv(RT, self._velocity_au_per_d)
+        return r, v, None, None
+
+    def rotation_at(self, t):
+        """Compute rotation from GCRS to each site’s altazimuth system."""
+        return _sites_mxm(self._R_latlon, itrs.rotation_at(t))
+
+    def _dRdt_times_RT_at(self, t):
+        V = super(GeographicSites, self)._dRdt_times_RT_at(t)
+        return V.reshape(V.shape + (1,) * len(t.shape))
+
 class Geoid(object):
     """An Earth ellipsoid: maps latitudes and longitudes to |xyz| positions.
 
@@ -169,6 +195,11 @@ class Geoid(object):
             from skyfield.api import N, S, E, W
             observatory = wgs84.latlon(37.3414 * N, 121.6429 * W)
 
+        The latitude, longitude, and elevation can also be arrays, in
+        which case each site is paired with the corresponding time of a
+        time array of the same shape.  To instead compute every site at
+        every time, see `latlon_sites()`.
+
         """
         latitude = Angle(degrees=latitude_degrees)
         longitude = Angle(degrees=longitude_degrees)
@@ -200,6 +231,24 @@ class Geoid(object):
         r = array((x, y, z))
         return cls(self, latitude, longitude, elevation, Distance(r))
 
+    def latlon_sites(self, latitude_degrees, longitude_degrees,
+                     elevation_m=0.0):
+        """Return a `GeographicSites` for arrays of latitudes and longitudes.
+
+        The arguments are the same as for `latlon()`, but the resulting
+        positions, and the positions of targets observed from them, have
+        extra dimensions for the sites ahead of any dimension for time,
+        instead of pairing each site with a time.  So a satellite is
+        propagated only once per time, however many sites observe it::
+
+            sites = wgs84.latlon_sites([37.3414, 40.8939],
+                                       [-121.6429, -83.8917])
+            alt, az, distance = (satellite - sites).at(t).altaz()
+
+        """
+        return self.latlon(latitude_degrees, longitude_degrees, elevation_m,
+                           GeographicSites)
+
     def latlon_of(self, position):
         """Return the latitude and longitude of a ``position``.
 
@@ -1,11 +1,11 @@
 """Vector functions and their composition."""
 
 from jplephem.names import target_names as _jpl_code_name_dict
-from numpy import max
+from numpy import broadcast_to, max
 from .constants import C_AUDAY
 from .descriptorlib import reify
 from .errors import DeprecationError
-from .functions import length_of
+from .functions import _broadcast_sites, length_of
 from .positionlib import build_position
 from .timelib import Time
 
@@ -215,8 +215,10 @@ class VectorSum(VectorFunction):
             p2, v2, _, message = vf._at(t)
             if vf.center == 399:
                 gcrs_position = -p
-            p += p2
-            v += v2
+            p, p2 = _broadcast_sites(p, p2)
+            v, v2 = _broadcast_sites(v, v2)
+            p = p + p2
+            v = v + v2
         if vfs[0].center == 0 and vf.center == 399:
             gcrs_position = p2
         return p, v, gcrs_position, message
@@ -240,6 +242,7 @@ def _correct_for_light_travel_time(observer, target):
     cvelocity = observer.velocity.au_per_d
 
     tposition, tvelocity, gcrs_position, message = target._at(t)
+    tposition, cposition = _broadcast_sites(tposition, cposition)
 
     distance = length_of(tposition - cposition)
     light_time0 = 0.0
@@ -252,13 +255,17 @@ def _correct_for_light_travel_time(observer, target):
         # We assume a light travel time of at most a couple of days.  A
         # longer light travel time would best be split into a whole and
         # fraction, for adding to the whole and fraction of TDB.
-        t2 = ts.tdb_jd(whole, tdb_fraction - light_time)
+        fraction = tdb_fraction - light_time
+        if getattr(fraction, 'ndim', 0) > getattr(whole, 'ndim', 0):
+            whole = broadcast_to(whole, fraction.shape)  # an array of sites
+        t2 = ts.tdb_jd(whole, fraction)
 
         tposition, tvelocity, gcrs_position, message = target._at(t2)
         distance = length_of(tposition - cposition)
         light_time0 = light_time
     else:
         raise ValueError('light-travel time failed to converge')
+    tvelocity, cvelocity = _broadcast_sites(tvelocity, cvelocity)
     return tposition - cposition, tvelocity - cvelocity, t, light_time
 
 def _jpl_name(target):